@@ -6,9 +6,12 @@ import os
 from dotenv import load_dotenv
 import json
 import random
+import bisect
 import time
+from array import array
 import sqlite3
 from threading import Lock, Thread
+from collections import OrderedDict
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 from telegram.ext import Application, CommandHandler, ContextTypes
 import hmac
@@ -18,7 +21,7 @@ import logging
 
 # Import business system
 from business_system import (
-    BusinessManager, BusinessRepository, BusinessType, EmployeeType,
+    Business, BusinessManager, BusinessRepository, BusinessType, EmployeeType,
     UpgradeType, EventType, BUSINESS_CONFIGS, EMPLOYEE_CONFIGS,
     UPGRADE_CONFIGS, EVENT_CONFIGS
 )
@@ -198,8 +201,23 @@ def init_db():
             conn.commit()
             logger.info(f"SQLite database initialized at {DB_PATH}")
 
+# Кэш сырых JSON-данных пользователей (LRU, write-through). 0 - выключен.
+# Каждый процесс держит свою копию, поэтому включать только при одном воркере.
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '0'))
+user_cache = OrderedDict()
+
+def cache_user_json(user_id, data_json):
+    """Положить данные в кэш и вытеснить самые старые записи (вызывать под db_lock)"""
+    if USER_CACHE_SIZE <= 0:
+        return
+    user_cache[user_id] = data_json
+    user_cache.move_to_end(user_id)
+    while len(user_cache) > USER_CACHE_SIZE:
+        user_cache.popitem(last=False)
+
 def save_user_data(user_id, data):
     """Сохранение данных пользователя в БД"""
+    data_json = json.dumps(data)
     with db_lock:
         if USE_POSTGRES:
             conn = psycopg2.connect(DATABASE_URL)
@@ -209,7 +227,7 @@ def save_user_data(user_id, data):
                 VALUES (%s, %s, CURRENT_TIMESTAMP)
                 ON CONFLICT (user_id) DO UPDATE 
                 SET data = EXCLUDED.data, last_updated = CURRENT_TIMESTAMP
-            ''', (user_id, json.dumps(data)))
+            ''', (user_id, data_json))
             conn.commit()
             cursor.close()
             conn.close()
@@ -219,12 +237,20 @@ def save_user_data(user_id, data):
                 cursor.execute('''
                     INSERT OR REPLACE INTO users (user_id, data, last_updated)
                     VALUES (?, ?, CURRENT_TIMESTAMP)
-                ''', (user_id, json.dumps(data)))
+                ''', (user_id, data_json))
                 conn.commit()
+        # Кэш обновляется только после записи в БД - вытеснение ничего не теряет
+        cache_user_json(user_id, data_json)
 
 def load_user_data(user_id):
     """Загрузка данных пользователя из БД"""
     with db_lock:
+        # Храним строку, а не dict - каждый вызов получает свою копию
+        data_json = user_cache.get(user_id)
+        if data_json is not None:
+            user_cache.move_to_end(user_id)
+            return json.loads(data_json)
+        
         if USE_POSTGRES:
             conn = psycopg2.connect(DATABASE_URL)
             cursor = conn.cursor()
@@ -232,28 +258,31 @@ def load_user_data(user_id):
             row = cursor.fetchone()
             cursor.close()
             conn.close()
-            if row:
-                return json.loads(row[0])
-            return None
         else:
             with sqlite3.connect(DB_PATH) as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT data FROM users WHERE user_id = ?', (user_id,))
                 row = cursor.fetchone()
-                if row:
-                    return json.loads(row[0])
-                return None
+        if row:
+            cache_user_json(user_id, row[0])
+            return json.loads(row[0])
+        return None
 
 # Инициализируем БД при старте
 init_db()
 
+# Кэш состояний карьеры (LRU, write-through). 0 - выключен.
+# Отдельная настройка от USER_CACHE_SIZE: таблица career_state пишется только
+# через CareerManager, но ограничение то же - включать только при одном воркере.
+CAREER_CACHE_SIZE = int(os.getenv('CAREER_CACHE_SIZE', '0'))
+
 # Инициализируем Career Manager с подключением к БД
 if USE_POSTGRES:
     career_db_conn = psycopg2.connect(DATABASE_URL)
-    career_manager = CareerManager(career_db_conn, use_postgres=True)
+    career_manager = CareerManager(career_db_conn, use_postgres=True, cache_size=CAREER_CACHE_SIZE)
 else:
     career_db_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    career_manager = CareerManager(career_db_conn, use_postgres=False)
+    career_manager = CareerManager(career_db_conn, use_postgres=False, cache_size=CAREER_CACHE_SIZE)
 
 # Валидация user_id
 import re
@@ -273,8 +302,71 @@ def clamp(value, min_val, max_val):
     """Ограничить значение в диапазоне"""
     return max(min_val, min(max_val, value))
 
+def user_delta(user, *fields):
+    """Изменившиеся поля пользователя - дополнительное поле 'changes' в ответах API
+    (рядом с полным 'user', который по-прежнему отдают все эндпоинты)"""
+    return {field: user[field] for field in fields}
+
+def user_for_api(user):
+    """Данные пользователя для ответа API.
+    Бизнесы хранятся индексом {business_id: dict} с датами-числами, а в ответе
+    остаются прежним списком с ISO-датами (как отдаёт /api/business/list)"""
+    if not user or not isinstance(user.get('businesses'), dict):
+        return user
+    businesses = user['businesses'].values()
+    return dict(user, businesses=[Business.from_dict(biz).to_dict() for biz in businesses])
+
+def default_user_data():
+    """Данные нового пользователя (все поля, которые читают обработчики)"""
+    return {
+        'player_name': None,
+        'name_set': False,
+        'tutorial_completed': False,
+        'profession_selected': False,
+        'money': 500,
+        'day': 1,
+        'max_days': 30,
+        'month': 1,
+        'energy': 100,
+        'max_energy': 100,
+        'money_per_work': 50,
+        'last_event': None,
+        'last_event_time': 0,
+        'salary': 25000,
+        'trait': None,
+        'trait_selected': False,
+        'current_job': 'delivery',
+        'unlocked_jobs': ['delivery'],
+        'next_job_to_unlock_idx': 0,
+        'boosters': {},
+        'owned_items': [],
+        'cars': [],
+        'real_estate': [],
+        'credits': [],
+        'monthly_income': 0,
+        'monthly_expenses': 0,
+        'completed_goals': [],
+        'total_goals_completed': 0,
+        'worked_today': False,
+        'mood': 50,
+        'total_earned': 0,
+        'total_spent': 0,
+        'work_count': 0,
+        'health': 100,
+        'skills': {
+            'speed': 1,
+            'luck': 1,
+            'charisma': 1,
+            'intelligence': 1
+        },
+        'skill_points': 0,
+        'rest_count': 0,
+        'rest_count_today': 0,
+        'had_credits': False
+    }
+
 def get_user_data_safe(user_id):
-    """Получить данные пользователя - всегда из БД, без кэша"""
+    """Получить данные пользователя из БД (через кэш, если задан USER_CACHE_SIZE)"""
     # Валидация user_id
     if not validate_user_id(user_id):
         logger.warning(f"Invalid user_id: {user_id}")
@@ -305,54 +397,25 @@ def get_user_data_safe(user_id):
             db_data['money'] = 0
             save_user_data(user_id, db_data)
         
+        # Дополняем недостающие поля значениями по умолчанию,
+        # чтобы обработчики читали их напрямую, без .get().
+        # Списки и словари из старых сохранений бывают null или другого типа -
+        # такие тоже заменяем значением по умолчанию
+        defaults = default_user_data()
+        for key, value in defaults.items():
+            if key not in db_data:
+                db_data[key] = value
+            elif isinstance(value, (dict, list)) and not isinstance(db_data[key], type(value)):
+                logger.warning(f"User {user_id}: bad '{key}' value {db_data[key]!r}, using default")
+                db_data[key] = value
+        for skill, level in defaults['skills'].items():
+            db_data['skills'].setdefault(skill, level)
+        
         return db_data
     else:
         # Создаем нового пользователя
         logger.info(f"Creating new user: {user_id}")
-        new_user = {
-            'player_name': None,
-            'name_set': False,
-            'tutorial_completed': False,
-            'profession_selected': False,
-            'money': 500,
-            'day': 1,
-            'max_days': 30,
-            'month': 1,
-            'energy': 100,
-            'max_energy': 100,
-            'money_per_work': 50,
-            'last_event': None,
-            'last_event_time': 0,
-            'salary': 25000,
-            'trait': None,
-            'trait_selected': False,
-            'current_job': 'delivery',
-            'unlocked_jobs': ['delivery'],
-            'boosters': {},
-            'owned_items': [],
-            'cars': [],
-            'real_estate': [],
-            'credits': [],
-            'monthly_income': 0,
-            'monthly_expenses': 0,
-            'completed_goals': [],
-            'total_goals_completed': 0,
-            'worked_today': False,
-            'mood': 50,
-            'total_earned': 0,
-            'total_spent': 0,
-            'work_count': 0,
-            'health': 100,
-            'skills': {
-                'speed': 1,
-                'luck': 1,
-                'charisma': 1,
-                'intelligence': 1
-            },
-            'skill_points': 0,
-            'rest_count': 0,
-            'had_credits': False
-        }
+        new_user = default_user_data()
         save_user_data(user_id, new_user)
         logger.info(f"Created new user: {user_id}")
         return new_user
@@ -431,6 +494,18 @@ EVENTS = [
     {"text": "Обычный рабочий день", "cost": 0, "emoji": "📧", "mood": 0},
 ]
 
+# Поля событий в параллельных массивах (индекс = позиция в EVENTS)
+EVENT_COSTS = array('i', [e['cost'] for e in EVENTS])
+EVENT_MOODS = array('i', [e.get('mood', 0) for e in EVENTS])
+EVENT_EMOJI = tuple(e['emoji'] for e in EVENTS)
+EVENT_TEXT = tuple(e['text'] for e in EVENTS)
+
+def roll_work_event(event_chance, rng=random):
+    """Случайное событие при работе: индекс в EVENTS (все равновероятны) или None"""
+    if rng.random() >= event_chance:
+        return None
+    return rng.randrange(len(EVENTS))
+
 # Черты личности
 TRAITS = {
     "терпила": {
@@ -463,6 +538,13 @@ TRAITS = {
     }
 }
 
+# Множитель стоимости негативных событий для каждой черты
+TRAIT_NEG_COST_MULT = {
+    "терпила": 1 - TRAITS["терпила"]["penalty_reduction"],
+    "экономный": 1 - TRAITS["экономный"]["cost_reduction"],
+    "рисковый": TRAITS["рисковый"]["negative_event_multiplier"]
+}
+
 # Виды работ (income rates managed by balance_system)
 JOBS = {
     "delivery": {
@@ -499,6 +581,17 @@ JOBS = {
     }
 }
 
+# Работы в порядке открытия (для next_day)
+SORTED_JOBS = sorted(JOBS.items(), key=lambda item: item[1]['unlock_day'])
+
+# Названия навыков для сообщений
+SKILL_NAMES = {
+    'speed': '🏃 Скорость',
+    'luck': '🍀 Удача',
+    'charisma': '💬 Харизма',
+    'intelligence': '🧠 Интеллект'
+}
+
 # Бустеры
 BOOSTERS = {
     "coffee": {
@@ -746,6 +839,43 @@ CREDIT_TYPES = {
     }
 }
 
+# Рулетка: границы накопленной вероятности и исходы
+# 60% проигрыш, 25% x2, 10% x5, 5% x10
+ROULETTE_CDF = (0.60, 0.85, 0.95)
+ROULETTE_MULT = (0, 2, 5, 10)
+ROULETTE_EMOJI = ('😭', '🙂', '😄', '🤑')
+ROULETTE_MESSAGES = (
+    'Проиграл! -{bet}₽',
+    'Выиграл x2! +{win}₽',
+    'Выиграл x5! +{win}₽',
+    'ДЖЕКПОТ x10! +{win}₽'
+)
+
+# Справочники выше не меняются во время работы - сериализуем их один раз при старте
+STATIC_JSON_MAX_AGE = 300  # Секунд, которые браузер может не перепроверять ответ
+
+def build_static_json(payload):
+    """Заранее сериализовать справочник и посчитать ETag"""
+    body = app.json.dumps(payload).encode('utf-8')
+    return body, hashlib.md5(body).hexdigest()
+
+def static_json_response(cached):
+    """Ответ из заранее сериализованного справочника (304 если ETag совпал)"""
+    body, etag = cached
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_JSON_MAX_AGE
+    return response.make_conditional(request)
+
+_TRAITS_JSON = build_static_json(TRAITS)
+_JOBS_JSON = build_static_json(JOBS)
+_BOOSTERS_JSON = build_static_json(BOOSTERS)
+_CARS_JSON = build_static_json(CARS)
+_REAL_ESTATE_JSON = build_static_json(REAL_ESTATE)
+_CREDIT_TYPES_JSON = build_static_json(CREDIT_TYPES)
+_GOALS_JSON = build_static_json(GLOBAL_GOALS)
+
 @app.route('/static/<path:filename>')
 def static_files(filename):
     return send_from_directory('static', filename)
@@ -844,7 +974,7 @@ def get_user(user_id):
     """Получить данные пользователя"""
     try:
         user_data = get_user_data_safe(user_id)
-        return jsonify(user_data)
+        return jsonify(user_for_api(user_data))
     except Exception as e:
         logger.error(f"Error getting user {user_id}: {e}")
         return jsonify({"error": "Internal server error"}), 500
@@ -968,6 +1098,7 @@ def reset_user(user_id):
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
                 conn.commit()
+        user_cache.pop(user_id, None)
     
     logger.info(f"User {user_id} data reset")
     return jsonify({"message": "User data reset successfully"})
@@ -975,32 +1106,32 @@ def reset_user(user_id):
 @app.route('/api/jobs')
 def get_jobs():
     """Получить список доступных работ"""
-    return jsonify(JOBS)
+    return static_json_response(_JOBS_JSON)
 
 @app.route('/api/boosters')
 def get_boosters():
     """Получить список доступных бустеров"""
-    return jsonify(BOOSTERS)
+    return static_json_response(_BOOSTERS_JSON)
 
 @app.route('/api/cars')
 def get_cars():
     """Получить список доступных машин"""
-    return jsonify(CARS)
+    return static_json_response(_CARS_JSON)
 
 @app.route('/api/real_estate')
 def get_real_estate():
     """Получить список доступной недвижимости"""
-    return jsonify(REAL_ESTATE)
+    return static_json_response(_REAL_ESTATE_JSON)
 
 @app.route('/api/credit_types')
 def get_credit_types():
     """Получить типы кредитов"""
-    return jsonify(CREDIT_TYPES)
+    return static_json_response(_CREDIT_TYPES_JSON)
 
 @app.route('/api/goals')
 def get_goals():
     """Получить список глобальных целей"""
-    return jsonify(GLOBAL_GOALS)
+    return static_json_response(_GOALS_JSON)
 
 @app.route('/api/check_goals', methods=['POST'])
 @limiter.limit("10 per minute")
@@ -1020,7 +1151,7 @@ def check_goals():
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'newly_completed_goals': newly_completed
     })
 
@@ -1051,7 +1182,7 @@ def change_job():
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'job': JOBS[job_id]
     })
 
@@ -1110,7 +1241,7 @@ def buy_booster():
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'booster': booster,
         'cost': cost
     })
@@ -1262,7 +1393,7 @@ def buy_car():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'car': car,
             'cost': cost,
             'payment_type': 'cash',
@@ -1319,7 +1450,7 @@ def buy_car():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'car': car,
             'down_payment': down_payment,
             'monthly_payment': monthly_payment,
@@ -1375,7 +1506,7 @@ def buy_real_estate():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'property': property_data,
             'cost': cost,
             'payment_type': 'cash'
@@ -1432,7 +1563,7 @@ def buy_real_estate():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'property': property_data,
             'down_payment': down_payment,
             'monthly_payment': monthly_payment,
@@ -1443,7 +1574,7 @@ def buy_real_estate():
 @app.route('/api/traits')
 def get_traits():
     """Получить список доступных черт личности"""
-    return jsonify(TRAITS)
+    return static_json_response(_TRAITS_JSON)
 
 @app.route('/api/select_trait', methods=['POST'])
 @limiter.limit("5 per minute")
@@ -1472,7 +1603,7 @@ def select_trait():
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'trait': TRAITS[trait_id]
     })
 
@@ -1494,14 +1625,15 @@ def buy_food():
         return jsonify({"error": "Недостаточно денег!"}), 400
     
     user['money'] -= cost
-    user['mood'] = min(100, user.get('mood', 50) + 10)
-    user['health'] = min(100, user.get('health', 100) + 15)  # Добавлено восстановление здоровья
+    user['mood'] = min(100, user['mood'] + 10)
+    user['health'] = min(100, user['health'] + 15)  # Добавлено восстановление здоровья
     
     # Сохраняем изменения в БД
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
+        'changes': user_delta(user, 'money', 'mood', 'health'),
         'message': 'Вкусно поел! +10 настроения, +15 здоровья'
     })
 
@@ -1519,20 +1651,21 @@ def take_rest():
         return jsonify({"error": "Invalid user_id"}), 400
     
     # Проверяем сколько раз уже отдыхал сегодня
-    rest_count = user.get('rest_count_today', 0)
+    rest_count = user['rest_count_today']
     if rest_count >= 2:
         return jsonify({"error": "Уже отдыхал 2 раза сегодня! Хватит лениться!"}), 400
     
     user['energy'] = min(user['max_energy'], user['energy'] + 20)
-    user['mood'] = min(100, user.get('mood', 50) + 5)
-    user['health'] = min(100, user.get('health', 100) + 10)  # Добавлено восстановление здоровья
+    user['mood'] = min(100, user['mood'] + 5)
+    user['health'] = min(100, user['health'] + 10)  # Добавлено восстановление здоровья
     user['rest_count_today'] = rest_count + 1
     
     # Сохраняем изменения в БД
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
+        'changes': user_delta(user, 'energy', 'mood', 'health', 'rest_count_today'),
         'message': f'Отдохнул! +20 энергии, +5 настроения, +10 здоровья ({2 - user["rest_count_today"]} раз осталось)'
     })
 
@@ -1550,35 +1683,34 @@ def random_event():
         return jsonify({"error": "Invalid user_id"}), 400
     
     # Выбираем случайное событие
-    event = random.choice(EVENTS)
-    event_cost = event['cost']
-    mood_change = event.get('mood', 0)
+    event_idx = random.randrange(len(EVENTS))
+    event = EVENTS[event_idx]
+    event_cost = EVENT_COSTS[event_idx]
+    mood_change = EVENT_MOODS[event_idx]
     
     # Применяем эффекты черт
-    if user.get('trait') == 'терпила' and event_cost < 0:
-        event_cost = int(event_cost * 0.8)
-    if user.get('trait') == 'экономный' and event_cost < 0:
-        event_cost = int(event_cost * 0.9)
-    if user.get('trait') == 'рисковый' and event_cost < 0:
-        event_cost = int(event_cost * 1.5)
+    if event_cost < 0:
+        event_cost = int(event_cost * TRAIT_NEG_COST_MULT.get(user['trait'], 1.0))
     
     user['money'] += event_cost
-    user['mood'] = max(0, min(100, user.get('mood', 50) + mood_change))
+    user['mood'] = max(0, min(100, user['mood'] + mood_change))
     
     if user['money'] < 0:
         user['money'] = 0
     
-    message = event['emoji'] + ' ' + event['text']
+    message_parts = [EVENT_EMOJI[event_idx], EVENT_TEXT[event_idx]]
     if event_cost != 0:
-        message += ' ' + ('+' if event_cost > 0 else '') + str(event_cost) + '₽'
+        message_parts.append(f'{event_cost:+d}₽')
     if mood_change != 0:
-        message += ' ' + ('+' if mood_change > 0 else '') + str(mood_change) + ' настроения'
+        message_parts.append(f'{mood_change:+d} настроения')
+    message = ' '.join(message_parts)
     
     # Сохраняем изменения в БД
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
+        'changes': user_delta(user, 'money', 'mood'),
         'event': event,
         'message': message
     })
@@ -1604,41 +1736,24 @@ def play_roulette():
     user['money'] -= bet
     
     # Крутим рулетку (шансы как в казино - больше проигрышей)
-    rand = random.random()
-    if rand < 0.60:  # 60% шанс - проигрыш
-        multiplier = 0
-        result_emoji = '😭'
-        message = f'Проиграл! -{bet}₽'
-    elif rand < 0.85:  # 25% шанс - x2
-        multiplier = 2
-        result_emoji = '🙂'
-        win = bet * multiplier
-        user['money'] += win
-        message = f'Выиграл x2! +{win}₽'
-    elif rand < 0.95:  # 10% шанс - x5
-        multiplier = 5
-        result_emoji = '😄'
-        win = bet * multiplier
-        user['money'] += win
-        message = f'Выиграл x5! +{win}₽'
-    else:  # 5% шанс - x10
-        multiplier = 10
-        result_emoji = '🤑'
-        win = bet * multiplier
-        user['money'] += win
-        message = f'ДЖЕКПОТ x10! +{win}₽'
+    idx = bisect.bisect_right(ROULETTE_CDF, random.random())
+    multiplier = ROULETTE_MULT[idx]
+    result_emoji = ROULETTE_EMOJI[idx]
+    win = bet * multiplier
+    user['money'] += win
+    message = ROULETTE_MESSAGES[idx].format(bet=bet, win=win)
     
     # Настроение меняется
     if multiplier == 0:
-        user['mood'] = max(0, user.get('mood', 50) - 10)
+        user['mood'] = max(0, user['mood'] - 10)
     elif multiplier >= 5:
-        user['mood'] = min(100, user.get('mood', 50) + 15)
+        user['mood'] = min(100, user['mood'] + 15)
     
     # Сохраняем изменения в БД
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'multiplier': multiplier,
         'result_emoji': result_emoji,
         'message': message
@@ -1658,14 +1773,10 @@ def upgrade_skill():
     if not user:
         return jsonify({"error": "Invalid user_id"}), 400
     
-    if 'skills' not in user:
-        user['skills'] = {'speed': 1, 'luck': 1, 'charisma': 1, 'intelligence': 1}
-    
     if skill not in user['skills']:
         return jsonify({"error": "Invalid skill"}), 400
     
-    skill_points = user.get('skill_points', 0)
-    if skill_points < 1:
+    if user['skill_points'] < 1:
         return jsonify({"error": "Недостаточно очков навыков!"}), 400
     
     current_level = user['skills'][skill]
@@ -1675,19 +1786,12 @@ def upgrade_skill():
     user['skills'][skill] += 1
     user['skill_points'] -= 1
     
-    skill_names = {
-        'speed': '🏃 Скорость',
-        'luck': '🍀 Удача',
-        'charisma': '💬 Харизма',
-        'intelligence': '🧠 Интеллект'
-    }
-    
     # Сохраняем изменения в БД
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
-        'message': f'{skill_names[skill]} повышена до уровня {user["skills"][skill]}!'
+        'user': user_for_api(user),
+        'message': f'{SKILL_NAMES[skill]} повышена до уровня {user["skills"][skill]}!'
     })
 
 @app.route('/api/work', methods=['POST'])
@@ -1708,12 +1812,14 @@ def work():
         return jsonify({"error": "Нет энергии!"}), 400
     
     # Получаем данные о текущей работе
-    current_job_id = user.get('current_job', 'delivery')
+    current_job_id = user['current_job']
     if current_job_id not in JOBS:
         current_job_id = 'delivery'
         user['current_job'] = current_job_id
         
     job = JOBS[current_job_id]
+    trait = user['trait']
+    owned_items = user['owned_items']
     
     # Базовый доход и трата энергии
     # Если у игрока есть профессия - используем карьерную систему
@@ -1730,14 +1836,14 @@ def work():
         energy_cost = job['energy_cost']
     
     # Применяем эффекты бустеров
-    if 'laptop' in user.get('owned_items', []) and current_job_id == 'office':
+    if 'laptop' in owned_items and current_job_id == 'office':
         income = int(income * BOOSTERS['laptop']['value'])
         
-    if 'scooter' in user.get('owned_items', []) and current_job_id == 'delivery':
+    if 'scooter' in owned_items and current_job_id == 'delivery':
         energy_cost = int(energy_cost * BOOSTERS['scooter']['value'])
     
     # Применяем бонусы от машин для доставки
-    if current_job_id == 'delivery' and user.get('cars'):
+    if current_job_id == 'delivery' and user['cars']:
         car_bonus = 0
         for car_id in user['cars']:
             if car_id in CARS:
@@ -1745,12 +1851,12 @@ def work():
         income = int(income * (1 + car_bonus))
     
     # Применяем эффект черты "Терпила" - снижение дохода
-    if user.get('trait') == 'терпила':
+    if trait == 'терпила':
         trait_data = TRAITS['терпила']
         income = int(income * (1 - trait_data['income_reduction']))
     
     # Применяем модификатор настроения
-    mood = user.get('mood', 50)
+    mood = user['mood']
     mood_modifier = 1.0
     if mood <= 20:
         mood_modifier = 0.7  # -30% при депрессии
@@ -1766,7 +1872,7 @@ def work():
     income = int(income * mood_modifier)
     
     # Применяем модификатор здоровья
-    health = user.get('health', 100)
+    health = user['health']
     health_modifier = 1.0
     if health <= 20:
         health_modifier = 0.5  # -50% при критическом здоровье
@@ -1782,83 +1888,78 @@ def work():
     income = int(income * health_modifier)
     
     # Проверяем достаточно ли энергии
-    if user['energy'] < energy_cost:
+    energy = user['energy']
+    if energy < energy_cost:
         return jsonify({"error": "Недостаточно энергии!"}), 400
     
-    # Работаем
-    user['money'] += income
-    user['energy'] -= energy_cost
+    # Работаем (изменения копим в локальных переменных, записываем в конце)
+    money = user['money'] + income
+    work_count = user['work_count'] + 1
+    user['energy'] = energy - energy_cost
     user['worked_today'] = True  # Отмечаем что работал сегодня
-    user['total_earned'] = user.get('total_earned', 0) + income
-    user['work_count'] = user.get('work_count', 0) + 1
+    user['total_earned'] += income
+    user['work_count'] = work_count
     
     # Записываем работу в карьерную систему
     if career_state:
         career_manager.record_work_action(user_id, income)
     
     # Даем очки навыков (1 очко за 5 работ)
-    if user['work_count'] % 5 == 0:
-        intelligence_bonus = 1 + (user.get('skills', {}).get('intelligence', 1) - 1) * 0.1
+    if work_count % 5 == 0:
+        intelligence_bonus = 1 + (user['skills']['intelligence'] - 1) * 0.1
         skill_points_earned = int(1 * intelligence_bonus)
-        user['skill_points'] = user.get('skill_points', 0) + skill_points_earned
+        user['skill_points'] += skill_points_earned
         # Сообщим игроку
         newly_earned_skill_point = True
     else:
         newly_earned_skill_point = False
     
     # Настроение немного падает от работы
-    user['mood'] = max(0, user.get('mood', 50) - 2)
+    mood = max(0, mood - 2)
     
     # Здоровье падает от работы
-    user['health'] = max(0, user.get('health', 100) - 1)
+    user['health'] = max(0, health - 1)
     
     # Определяем шанс события
     event_chance = 0.2  # Базовый шанс 20%
     
     # Применяем эффект черты "Рисковый" - увеличение шанса событий
-    if user.get('trait') == 'рисковый':
+    if trait == 'рисковый':
         trait_data = TRAITS['рисковый']
         event_chance += trait_data['event_chance_bonus']
     
     # Случайное событие
     event = None
     current_time = time.time()
-    if (random.random() < event_chance and 
+    event_idx = roll_work_event(event_chance)
+    if (event_idx is not None and 
         current_time - user['last_event_time'] > 30):  # Минимум 30 сек между событиями
         
-        event = random.choice(EVENTS)
-        event_cost = event['cost']
+        event_cost = EVENT_COSTS[event_idx]
         
-        # Применяем эффект черты "Терпила" - снижение штрафов
-        if user.get('trait') == 'терпила' and event_cost < 0:
-            trait_data = TRAITS['терпила']
-            event_cost = int(event_cost * (1 - trait_data['penalty_reduction']))
-            
-        # Применяем эффект черты "Экономный" - снижение трат
-        if user.get('trait') == 'экономный' and event_cost < 0:
-            trait_data = TRAITS['экономный']
-            event_cost = int(event_cost * (1 - trait_data['cost_reduction']))
-            
-        # Применяем эффект черты "Рисковый" - больше негативных событий
-        if user.get('trait') == 'рисковый' and event_cost < 0:
-            trait_data = TRAITS['рисковый']
-            event_cost = int(event_cost * trait_data['negative_event_multiplier'])
-            if random.random() < 0.3:  # 30% шанс усилить негативное событие
-                event_cost = int(event_cost * trait_data['negative_event_multiplier'])
+        # Применяем эффекты черт к негативным событиям
+        # (Терпила и Экономный - снижение штрафов, Рисковый - усиление)
+        if event_cost < 0:
+            event_cost = int(event_cost * TRAIT_NEG_COST_MULT.get(trait, 1.0))
+            if trait == 'рисковый' and random.random() < 0.3:  # 30% шанс усилить негативное событие
+                event_cost = int(event_cost * TRAITS['рисковый']['negative_event_multiplier'])
         
-        user['money'] += event_cost
-        event['cost'] = event_cost  # Обновляем стоимость для отображения
+        money += event_cost
+        # Копия с итоговой стоимостью для отображения (общий EVENTS не меняем)
+        event = dict(EVENTS[event_idx], cost=event_cost)
         
         # Применяем изменение настроения от события
-        mood_change = event.get('mood', 0)
-        user['mood'] = max(0, min(100, user.get('mood', 50) + mood_change))
+        mood = max(0, min(100, mood + EVENT_MOODS[event_idx]))
         
         user['last_event'] = event
         user['last_event_time'] = current_time
         
         # Не даем деньгам уйти в минус
-        if user['money'] < 0:
-            user['money'] = 0
+        if money < 0:
+            money = 0
+    
+    user['money'] = money
+    user['mood'] = mood
     
     # Проверяем выполнение целей
     newly_completed_goals = check_and_complete_goals(user)
@@ -1867,7 +1968,7 @@ def work():
     save_user_data_safe(user_id, user)
     
     return jsonify({
-        'user': user,
+        'user': user_for_api(user),
         'event': event,
         'income': income,
         'job': job,
@@ -1893,8 +1994,9 @@ def next_day():
     user['rest_count_today'] = 0  # Сбрасываем счетчик отдыха
     
     # Проверяем черту "Прокрастинатор" - иногда день проходит без действий
+    trait = user['trait']
     day_skipped = False
-    if user.get('trait') == 'прокрастинатор':
+    if trait == 'прокрастинатор':
         trait_data = TRAITS['прокрастинатор']
         if random.random() < trait_data['skip_day_chance']:
             day_skipped = True
@@ -1904,14 +2006,14 @@ def next_day():
             # Сохраняем изменения в БД
             save_user_data_safe(user_id, user)
             return jsonify({
-                'user': user,
+                'user': user_for_api(user),
                 'day_skipped': True,
                 'message': "Прокрастинировал весь день... Но хотя бы отдохнул! 😴"
             })
     
     # Обновляем бустеры
     expired_boosters = []
-    for booster_id, days_left in user.get('boosters', {}).items():
+    for booster_id, days_left in user['boosters'].items():
         if days_left > 0:
             user['boosters'][booster_id] = days_left - 1
             if user['boosters'][booster_id] <= 0:
@@ -1923,13 +2025,15 @@ def next_day():
     
     # Открываем новые работы по дням
     new_jobs = []
-    if 'unlocked_jobs' not in user:
-        user['unlocked_jobs'] = []
-    for job_id, job_data in JOBS.items():
-        if (user['day'] >= job_data['unlock_day'] and 
-            job_id not in user['unlocked_jobs']):
+    # Работы отсортированы по дню открытия - проверяем только ещё не пройденные
+    job_idx = user['next_job_to_unlock_idx']
+    while job_idx < len(SORTED_JOBS) and user['day'] >= SORTED_JOBS[job_idx][1]['unlock_day']:
+        job_id, job_data = SORTED_JOBS[job_idx]
+        if job_id not in user['unlocked_jobs']:  # Могла открыться раньше через бустер
             user['unlocked_jobs'].append(job_id)
             new_jobs.append(job_data)
+        job_idx += 1
+    user['next_job_to_unlock_idx'] = job_idx
     
     if user['day'] >= user['max_days']:
         # Получаем зарплату!
@@ -1937,12 +2041,10 @@ def next_day():
         user['day'] = 1
         
         # Увеличиваем месяц (уровень) вместо сброса игры
-        if 'month' not in user:
-            user['month'] = 1
         user['month'] += 1
         
         user['energy'] = user['max_energy']
-        user['health'] = min(100, user.get('health', 100) + 30)  # Восстанавливаем здоровье
+        user['health'] = min(100, user['health'] + 30)  # Восстанавливаем здоровье
         
         # Проверяем выполнение целей
         newly_completed_goals = check_and_complete_goals(user)
@@ -1951,7 +2053,7 @@ def next_day():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'salary_received': True,
             'message': f"🎉 Месяц {user['month']-1} завершен! Получена зарплата {user['salary']}₽",
             'new_jobs': new_jobs,
@@ -1960,7 +2062,7 @@ def next_day():
     else:
         user['day'] += 1
         user['energy'] = user['max_energy']  # Восстанавливаем энергию
-        user['health'] = min(100, user.get('health', 100) + 30)  # Восстанавливаем здоровье
+        user['health'] = min(100, user['health'] + 30)  # Восстанавливаем здоровье
         
         # ОБРАБОТКА БАЛАНСИРОВКИ ЭКОНОМИКИ - ежедневные расходы и события
         balance_result = balance_manager.process_new_day(user_id)
@@ -1977,23 +2079,23 @@ def next_day():
         
         if user['day'] % 30 == 1:  # Первый день месяца
             # Пассивный доход от недвижимости
-            for property_id in user.get('real_estate', []):
+            for property_id in user['real_estate']:
                 if property_id in REAL_ESTATE:
                     passive_income += REAL_ESTATE[property_id]['monthly_income']
             
             # Расходы на машины
-            for car_id in user.get('cars', []):
+            for car_id in user['cars']:
                 if car_id in CARS:
                     monthly_expenses += CARS[car_id]['monthly_cost']
             
             # Расходы на недвижимость
-            for property_id in user.get('real_estate', []):
+            for property_id in user['real_estate']:
                 if property_id in REAL_ESTATE:
                     monthly_expenses += abs(REAL_ESTATE[property_id]['monthly_cost'])
             
             # Платежи по кредитам
             expired_credits = []
-            credits_list = user.get('credits', [])
+            credits_list = user['credits']
             for i, credit in enumerate(credits_list):
                 monthly_expenses += credit.get('monthly_payment', 0)
                 credit['remaining_months'] -= 1
@@ -2010,7 +2112,7 @@ def next_day():
             user['money'] += passive_income - monthly_expenses
             
             # Если кредитов больше нет, но они были - можно получить достижение
-            if len(user.get('credits', [])) == 0 and user.get('had_credits', False):
+            if len(user['credits']) == 0 and user['had_credits']:
                 # Проверяем достижение "Без долгов"
                 pass
         
@@ -2018,7 +2120,7 @@ def next_day():
         daily_cost = random.randint(200, 500)
         
         # Применяем эффект черты "Экономный" - снижение трат
-        if user.get('trait') == 'экономный':
+        if trait == 'экономный':
             trait_data = TRAITS['экономный']
             daily_cost = int(daily_cost * (1 - trait_data['cost_reduction']))
             
@@ -2066,7 +2168,7 @@ def next_day():
         save_user_data_safe(user_id, user)
         
         return jsonify({
-            'user': user,
+            'user': user_for_api(user),
             'daily_cost': daily_cost,
             'passive_income': passive_income if user['day'] % 30 == 1 else 0,
             'monthly_expenses': monthly_expenses if user['day'] % 30 == 1 else 0,
@@ -2787,6 +2889,7 @@ def admin_reset_database():
                     deleted_count = cursor.rowcount
                     conn.commit()
                 logger.info(f"SQLite: Deleted {deleted_count} users")
+            user_cache.clear()
         
         return jsonify({
             "success": True,
@@ -2937,8 +3040,11 @@ if os.getenv('RUN_BOT', 'false').lower() == 'true':
     # logger.info("Bot thread started")
 
 if __name__ == '__main__':
-    # Для локальной разработки - только Flask без бота
+    # Для локальной разработки - только Flask без бота.
+    # В продакшене приложение запускается через gunicorn (см. Procfile: gunicorn app:app),
+    # встроенный сервер Werkzeug для этого не предназначен
     logger.info("🚀 Запуск в режиме разработки (только Flask, без Telegram бота)")
+    logger.warning("⚠️ Встроенный сервер только для разработки, в продакшене используйте: gunicorn app:app")
     logger.info("💡 Чтобы запустить бота, установите переменную окружения: RUN_BOT=true")
     port = int(os.environ.get('PORT', 8080))  # Изменили порт на 8080
     logger.info(f"🌐 Запуск на порту {port}")
@@ -6,6 +6,8 @@ This module contains all configuration parameters for the economy balancing syst
 All values can be modified here without changing code.
 """
 
+from bisect import bisect_left
+
 # ============================================================================
 # DAILY EXPENSES
 # ============================================================================
@@ -62,6 +64,10 @@ WEALTH_TIERS = {
     }
 }
 
+# Tier lookup table: upper bounds of all tiers but the last, in ascending order
+TIER_NAMES = tuple(WEALTH_TIERS)
+TIER_THRESHOLDS = tuple(WEALTH_TIERS[name]['max'] for name in TIER_NAMES[:-1])
+
 # ============================================================================
 # NEGATIVE EVENTS
 # ============================================================================
@@ -134,6 +140,8 @@ SURVIVAL_SETTINGS = {
 HISTORY_SETTINGS = {
     'max_days': 30,                   # Maximum days to keep in history
     'auto_cleanup': True,             # Automatically cleanup old records
+    'cap_by_count': False,            # Keep last max_records instead of last max_days
+    'max_records': 120,               # Records per history type when cap_by_count is on
 }
 
 # ============================================================================
@@ -143,6 +151,7 @@ HISTORY_SETTINGS = {
 def get_wealth_tier_by_balance(balance: float) -> str:
     """
     Determines wealth tier based on balance.
+    Balance equal to a tier's max still belongs to that tier.
     
     Args:
         balance: Current player balance
@@ -150,10 +159,7 @@ def get_wealth_tier_by_balance(balance: float) -> str:
     Returns:
         Tier name: 'poor', 'middle', or 'rich'
     """
-    for tier_name, tier_config in WEALTH_TIERS.items():
-        if tier_config['min'] <= balance <= tier_config['max']:
-            return tier_name
-    return 'poor'  # Default fallback
+    return TIER_NAMES[bisect_left(TIER_THRESHOLDS, balance)]
 
 
 def get_expense_multiplier(tier: str) -> float:
@@ -8,6 +8,7 @@ It manages daily expenses, income adjustments, negative events, and wealth tiers
 
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
+from fractions import Fraction
 import random
 from balance_config import (
     DAILY_EXPENSES, JOB_INCOME, WEALTH_TIERS, NEGATIVE_EVENTS,
@@ -23,12 +24,13 @@ from balance_config import (
 class ExpenseCalculator:
     """Calculates daily expenses for player"""
     
-    def calculate_daily_expenses(self, user_data: Dict) -> Dict:
+    def calculate_daily_expenses(self, user_data: Dict, now: Optional[datetime] = None) -> Dict:
         """
         Calculates total daily expenses with breakdown.
         
         Args:
             user_data: Player data including balance, property, wealth tier
+            now: Current time (defaults to datetime.now())
             
         Returns:
             {
@@ -67,7 +69,7 @@ class ExpenseCalculator:
             'tier': tier,
             'tier_multiplier': tier_multiplier,
             'final_total': final_total,
-            'date': datetime.now().isoformat()
+            'date': (now or datetime.now()).isoformat()
         }
     
     def calculate_rent(self, user_data: Dict) -> float:
@@ -139,6 +141,8 @@ class WealthTierManager:
     def check_tier_change(self, user_data: Dict, new_balance: float) -> Optional[str]:
         """
         Checks if player changed wealth tier.
+        Classifies both balances; prefer check_tier_change_fast when
+        the stored tier is at hand.
         
         Args:
             user_data: Current player data
@@ -160,6 +164,20 @@ class WealthTierManager:
         
         return None
     
+    def check_tier_change_fast(self, old_tier: str, new_balance: float) -> Optional[str]:
+        """
+        Checks tier change against an already known (stored) tier.
+        
+        Args:
+            old_tier: Current tier from balance_data
+            new_balance: New balance after transaction
+            
+        Returns:
+            New tier name if changed, None otherwise
+        """
+        new_tier = self.get_wealth_tier(new_balance)
+        return new_tier if new_tier != old_tier else None
+    
     def get_tier_info(self, tier: str) -> Dict:
         """
         Returns full information about a tier.
@@ -180,6 +198,13 @@ class WealthTierManager:
 class DebtTracker:
     """Tracks player debt and applies consequences"""
     
+    def __init__(self):
+        """Initialize debt tracker (collector share is read once here)"""
+        # Collector share as an exact ratio, e.g. 0.20 -> 1/5, for integer cent math
+        collector_ratio = Fraction(str(DEBT_SETTINGS['collector_percentage']))
+        self._collector_num = collector_ratio.numerator
+        self._collector_den = collector_ratio.denominator
+    
     def track_debt(self, user_data: Dict) -> None:
         """
         Updates debt tracking when balance is negative.
@@ -188,8 +213,6 @@ class DebtTracker:
         Args:
             user_data: Player data (modified in place)
         """
-        balance = user_data.get('money', 0)
-        
         # Initialize balance_data if not exists
         if 'balance_data' not in user_data:
             user_data['balance_data'] = {
@@ -198,12 +221,28 @@ class DebtTracker:
                 'last_expense_breakdown': {}
             }
         
-        # If balance is negative, increment debt days
+        self.update_debt(user_data.get('money', 0), user_data['balance_data'])
+    
+    def update_debt(self, balance: float, balance_data: Dict) -> Tuple[bool, int, float]:
+        """
+        Updates debt days for given balance in one pass.
+        
+        Args:
+            balance: Current balance
+            balance_data: Player balance_data (modified in place)
+            
+        Returns:
+            (in_debt, debt_days, debt_amount)
+        """
         if balance < 0:
-            user_data['balance_data']['debt_days'] = user_data['balance_data'].get('debt_days', 0) + 1
-        else:
-            # Reset debt days if balance is positive
-            user_data['balance_data']['debt_days'] = 0
+            # If balance is negative, increment debt days
+            debt_days = balance_data.get('debt_days', 0) + 1
+            balance_data['debt_days'] = debt_days
+            return True, debt_days, -balance
+        
+        # Reset debt days if balance is positive
+        balance_data['debt_days'] = 0
+        return False, 0, 0.0
     
     def get_debt_amount(self, balance: float) -> float:
         """
@@ -259,7 +298,9 @@ class DebtTracker:
         Returns:
             Collector cost
         """
-        return round(debt_amount * DEBT_SETTINGS['collector_percentage'], 2)
+        cents = round(debt_amount * 100)
+        # Half-up rounding to whole cents
+        return (cents * self._collector_num * 2 + self._collector_den) // (self._collector_den * 2) / 100
     
     def get_event_probability_modifier(self, debt_days: int) -> float:
         """
@@ -279,9 +320,24 @@ class DebtTracker:
 # NEGATIVE EVENT MANAGER
 # ============================================================================
 
+# Event configs with 'type' baked in, built once at import
+_NEG_EVENTS = tuple(
+    {'type': event_type, **config} for event_type, config in NEGATIVE_EVENTS.items()
+)
+
+
 class NegativeEventManager:
     """Manages negative random events"""
     
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        Initialize event manager.
+        
+        Args:
+            rng: Random generator to draw from (own instance by default)
+        """
+        self._rng = rng or random.Random()
+    
     def should_trigger_event(self, base_probability: float) -> bool:
         """
         Determines if event should trigger based on probability.
@@ -292,7 +348,7 @@ class NegativeEventManager:
         Returns:
             True if event triggers
         """
-        return random.random() < base_probability
+        return self._rng.random() < base_probability
     
     def select_random_event(self) -> Dict:
         """
@@ -301,11 +357,7 @@ class NegativeEventManager:
         Returns:
             Event configuration with cost range, name, emoji
         """
-        event_type = random.choice(list(NEGATIVE_EVENTS.keys()))
-        return {
-            'type': event_type,
-            **NEGATIVE_EVENTS[event_type]
-        }
+        return dict(self._rng.choice(_NEG_EVENTS))
     
     def calculate_event_cost(self, event_config: Dict) -> int:
         """
@@ -319,9 +371,10 @@ class NegativeEventManager:
         """
         min_cost = event_config['min_cost']
         max_cost = event_config['max_cost']
-        return random.randint(min_cost, max_cost)
+        return self._rng.randint(min_cost, max_cost)
     
-    def apply_event(self, user_data: Dict, event: Dict, cost: int) -> Dict:
+    def apply_event(self, user_data: Dict, event: Dict, cost: int,
+                    now: Optional[datetime] = None) -> Dict:
         """
         Applies event to player (deducts cost, records history).
         
@@ -329,6 +382,7 @@ class NegativeEventManager:
             user_data: Player data (modified in place)
             event: Event configuration
             cost: Event cost
+            now: Current time (defaults to datetime.now())
             
         Returns:
             Event result summary
@@ -344,7 +398,7 @@ class NegativeEventManager:
             'emoji': event['emoji'],
             'cost': cost,
             'new_balance': user_data['money'],
-            'date': datetime.now().isoformat()
+            'date': (now or datetime.now()).isoformat()
         }
 
 
@@ -352,66 +406,106 @@ class NegativeEventManager:
 # FINANCIAL HISTORY MANAGER
 # ============================================================================
 
+def _record_timestamp(record: Dict) -> Optional[float]:
+    """Returns record timestamp, or None if the record has no parsable date"""
+    ts = record.get('ts')
+    if ts is not None:
+        return ts
+    # Records saved before 'ts' was introduced only have the ISO date
+    try:
+        return datetime.fromisoformat(record['date']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _stamped_record(record: Dict, now: Optional[datetime]) -> Dict:
+    """
+    Returns a copy of a caller-built record with 'ts' set (the caller's dict
+    is left untouched). Uses `now`; the record's own 'date' is parsed only
+    when no time was passed in.
+    """
+    stamped = dict(record)
+    if 'ts' not in stamped:
+        ts = now.timestamp() if now is not None else _record_timestamp(stamped)
+        if ts is not None:
+            stamped['ts'] = ts
+    return stamped
+
+
 class FinancialHistoryManager:
     """Manages financial history tracking"""
     
     def __init__(self):
-        """Initialize history manager"""
+        """Initialize history manager (settings are read once here)"""
         self.max_days = HISTORY_SETTINGS['max_days']
+        self.max_records = HISTORY_SETTINGS['max_records']
+        self.cap_by_count = HISTORY_SETTINGS['cap_by_count']
+        self.auto_cleanup = HISTORY_SETTINGS['auto_cleanup']
+        self._max_age_seconds = self.max_days * 24 * 60 * 60
     
-    def record_daily_expenses(self, user_data: Dict, expense_data: Dict) -> None:
+    def record_daily_expenses(self, user_data: Dict, expense_data: Dict,
+                              now: Optional[datetime] = None) -> None:
         """
         Records daily expense breakdown.
         
         Args:
             user_data: Player data (modified in place)
             expense_data: Expense breakdown
+            now: Current time (defaults to datetime.now())
         """
         self._ensure_history_structure(user_data)
         
         # Add expense record
-        user_data['financial_history']['expenses'].append(expense_data)
+        user_data['financial_history']['expenses'].append(_stamped_record(expense_data, now))
         
         # Cleanup old records
-        self._cleanup_old_records(user_data, 'expenses')
+        self._cleanup_old_records(user_data, 'expenses', now)
     
-    def record_daily_income(self, user_data: Dict, income_data: Dict) -> None:
+    def record_daily_income(self, user_data: Dict, income_data: Dict,
+                            now: Optional[datetime] = None) -> None:
         """
         Records daily income by source.
         
         Args:
             user_data: Player data (modified in place)
             income_data: Income information
+            now: Current time (defaults to datetime.now())
         """
+        if now is None:
+            now = datetime.now()
         self._ensure_history_structure(user_data)
         
         # Add income record
         income_record = {
-            'date': datetime.now().isoformat(),
+            'date': now.isoformat(),
+            'ts': now.timestamp(),
             **income_data
         }
         user_data['financial_history']['income'].append(income_record)
         
         # Cleanup old records
-        self._cleanup_old_records(user_data, 'income')
+        self._cleanup_old_records(user_data, 'income', now)
     
-    def record_negative_event(self, user_data: Dict, event_data: Dict) -> None:
+    def record_negative_event(self, user_data: Dict, event_data: Dict,
+                              now: Optional[datetime] = None) -> None:
         """
         Records negative event occurrence.
         
         Args:
             user_data: Player data (modified in place)
             event_data: Event information
+            now: Current time (defaults to datetime.now())
         """
         self._ensure_history_structure(user_data)
         
         # Add event record
-        user_data['financial_history']['events'].append(event_data)
+        user_data['financial_history']['events'].append(_stamped_record(event_data, now))
         
         # Cleanup old records
-        self._cleanup_old_records(user_data, 'events')
+        self._cleanup_old_records(user_data, 'events', now)
     
-    def record_tier_change(self, user_data: Dict, old_tier: str, new_tier: str) -> None:
+    def record_tier_change(self, user_data: Dict, old_tier: str, new_tier: str,
+                           now: Optional[datetime] = None) -> None:
         """
         Records wealth tier change.
         
@@ -419,12 +513,16 @@ class FinancialHistoryManager:
             user_data: Player data (modified in place)
             old_tier: Previous tier
             new_tier: New tier
+            now: Current time (defaults to datetime.now())
         """
+        if now is None:
+            now = datetime.now()
         self._ensure_history_structure(user_data)
         
         # Add tier change record
         tier_change = {
-            'date': datetime.now().isoformat(),
+            'date': now.isoformat(),
+            'ts': now.timestamp(),
             'old_tier': old_tier,
             'new_tier': new_tier,
             'balance': user_data.get('money', 0)
@@ -432,7 +530,7 @@ class FinancialHistoryManager:
         user_data['financial_history']['tier_changes'].append(tier_change)
         
         # Cleanup old records
-        self._cleanup_old_records(user_data, 'tier_changes')
+        self._cleanup_old_records(user_data, 'tier_changes', now)
     
     def get_history(self, user_data: Dict, days: int = 30) -> Dict:
         """
@@ -459,17 +557,13 @@ class FinancialHistoryManager:
         # Filter records by date
         history = user_data['financial_history']
         
+        def is_recent(record):
+            # Records without a parsable date are always included
+            ts = _record_timestamp(record)
+            return ts is None or ts >= cutoff_timestamp
+        
         def filter_by_date(records):
-            filtered = []
-            for record in records:
-                try:
-                    record_date = datetime.fromisoformat(record['date'])
-                    if record_date.timestamp() >= cutoff_timestamp:
-                        filtered.append(record)
-                except:
-                    # If date parsing fails, include the record
-                    filtered.append(record)
-            return filtered
+            return [r for r in records if is_recent(r)]
         
         return {
             'expenses': filter_by_date(history.get('expenses', [])),
@@ -488,33 +582,45 @@ class FinancialHistoryManager:
                 'tier_changes': []
             }
     
-    def _cleanup_old_records(self, user_data: Dict, record_type: str) -> None:
+    def _cleanup_old_records(self, user_data: Dict, record_type: str,
+                             now: Optional[datetime] = None) -> None:
         """
-        Removes records older than max_days.
+        Removes records older than max_days, or everything but the last
+        max_records when history is capped by count.
         
         Args:
             user_data: Player data
             record_type: Type of records to cleanup
+            now: Current time (defaults to datetime.now())
         """
-        if not HISTORY_SETTINGS['auto_cleanup']:
+        if self.cap_by_count:
+            # Lists stay lists so the user blob remains plain JSON
+            records = user_data['financial_history'].setdefault(record_type, [])
+            if len(records) > self.max_records:
+                del records[:-self.max_records]
             return
         
-        cutoff_date = datetime.now()
-        cutoff_timestamp = cutoff_date.timestamp() - (self.max_days * 24 * 60 * 60)
+        if not self.auto_cleanup:
+            return
         
-        records = user_data['financial_history'].get(record_type, [])
-        filtered_records = []
+        cutoff_date = now or datetime.now()
+        cutoff_timestamp = cutoff_date.timestamp() - self._max_age_seconds
         
+        # Records are appended in chronological order, so expired ones form
+        # a prefix; cleanup runs on every append, so it is usually 0-1 records.
+        # Records without a parsable date are kept but do not stop the scan
+        records = user_data['financial_history'].setdefault(record_type, [])
+        prefix = 0
+        undated = []
         for record in records:
-            try:
-                record_date = datetime.fromisoformat(record['date'])
-                if record_date.timestamp() >= cutoff_timestamp:
-                    filtered_records.append(record)
-            except:
-                # If date parsing fails, keep the record
-                filtered_records.append(record)
-        
-        user_data['financial_history'][record_type] = filtered_records
+            ts = _record_timestamp(record)
+            if ts is not None and ts >= cutoff_timestamp:
+                break
+            if ts is None:
+                undated.append(record)
+            prefix += 1
+        if prefix:
+            records[:prefix] = undated
 
 
 # ============================================================================
@@ -559,6 +665,9 @@ class BalanceManager:
         if not user:
             return {'success': False, 'error': 'User not found'}
         
+        # Single timestamp for the whole tick, shared by all history records
+        now = datetime.now()
+        
         result = {
             'success': True,
             'expenses': None,
@@ -567,46 +676,50 @@ class BalanceManager:
             'debt_info': None
         }
         
+        balance_data = user.setdefault('balance_data', {
+            'wealth_tier': 'poor',
+            'debt_days': 0,
+            'last_expense_breakdown': {}
+        })
+        
         # 1. Calculate and deduct daily expenses
-        expenses = self.expense_calculator.calculate_daily_expenses(user)
-        user['money'] = user.get('money', 0) - expenses['final_total']
+        expenses = self.expense_calculator.calculate_daily_expenses(user, now)
+        money = user.get('money', 0) - expenses['final_total']
+        user['money'] = money
         
         # Store last expense breakdown
-        if 'balance_data' not in user:
-            user['balance_data'] = {}
-        user['balance_data']['last_expense_breakdown'] = expenses
+        balance_data['last_expense_breakdown'] = expenses
         
         # Record expenses in history
-        self.history_manager.record_daily_expenses(user, expenses)
+        self.history_manager.record_daily_expenses(user, expenses, now)
         result['expenses'] = expenses
         
         # 2. Check and update wealth tier
-        old_tier = user['balance_data'].get('wealth_tier', 'poor')
-        new_tier = self.wealth_tier_manager.get_wealth_tier(user['money'])
+        old_tier = balance_data.get('wealth_tier', 'poor')
+        new_tier = self.wealth_tier_manager.check_tier_change_fast(old_tier, money)
         
-        if old_tier != new_tier:
-            user['balance_data']['wealth_tier'] = new_tier
-            self.history_manager.record_tier_change(user, old_tier, new_tier)
+        if new_tier:
+            balance_data['wealth_tier'] = new_tier
+            self.history_manager.record_tier_change(user, old_tier, new_tier, now)
             result['tier_change'] = {
                 'old': old_tier,
                 'new': new_tier
             }
         
         # 3. Track debt if balance negative
-        self.debt_tracker.track_debt(user)
-        debt_days = self.debt_tracker.get_debt_days(user)
-        debt_amount = self.debt_tracker.get_debt_amount(user['money'])
+        in_debt, debt_days, debt_amount = self.debt_tracker.update_debt(money, balance_data)
         
         result['debt_info'] = {
-            'in_debt': user['money'] < 0,
+            'in_debt': in_debt,
             'debt_amount': debt_amount,
             'debt_days': debt_days
         }
         
-        # 4. Check for debt collector
-        if self.debt_tracker.should_trigger_collector(user):
+        # 4. Check for debt collector (7+ days in debt)
+        if in_debt and debt_days >= DEBT_SETTINGS['collector_trigger_days']:
             collector_cost = self.debt_tracker.calculate_collector_cost(debt_amount)
-            user['money'] -= collector_cost
+            money -= collector_cost
+            user['money'] = money
             
             # Record as special event
             collector_event = {
@@ -615,10 +728,10 @@ class BalanceManager:
                 'description': f'Коллектор забрал {collector_cost}₽',
                 'emoji': '👔',
                 'cost': collector_cost,
-                'new_balance': user['money'],
-                'date': datetime.now().isoformat()
+                'new_balance': money,
+                'date': now.isoformat()
             }
-            self.history_manager.record_negative_event(user, collector_event)
+            self.history_manager.record_negative_event(user, collector_event, now)
             result['event'] = collector_event
         else:
             # 5. Trigger negative events (if no collector)
@@ -627,10 +740,10 @@ class BalanceManager:
             if self.event_manager.should_trigger_event(event_probability):
                 event = self.event_manager.select_random_event()
                 cost = self.event_manager.calculate_event_cost(event)
-                event_result = self.event_manager.apply_event(user, event, cost)
+                event_result = self.event_manager.apply_event(user, event, cost, now)
                 
                 # Record event in history
-                self.history_manager.record_negative_event(user, event_result)
+                self.history_manager.record_negative_event(user, event_result, now)
                 result['event'] = event_result
         
         # Save user data
@@ -658,6 +771,7 @@ class BalanceManager:
             return {'success': False, 'error': f'Invalid job type: {job_type}'}
         
         income = JOB_INCOME[job_type]
+        now = datetime.now()
         
         # Apply income
         user['money'] = user.get('money', 0) + income
@@ -667,19 +781,16 @@ class BalanceManager:
             'source': job_type,
             'amount': income
         }
-        self.history_manager.record_daily_income(user, income_data)
+        self.history_manager.record_daily_income(user, income_data, now)
         
         # Check for tier change
         old_tier = user.get('balance_data', {}).get('wealth_tier', 'poor')
-        new_tier = self.wealth_tier_manager.get_wealth_tier(user['money'])
+        new_tier = self.wealth_tier_manager.check_tier_change_fast(old_tier, user['money'])
         
-        tier_changed = False
-        if old_tier != new_tier:
-            if 'balance_data' not in user:
-                user['balance_data'] = {}
-            user['balance_data']['wealth_tier'] = new_tier
-            self.history_manager.record_tier_change(user, old_tier, new_tier)
-            tier_changed = True
+        tier_changed = new_tier is not None
+        if tier_changed:
+            user.setdefault('balance_data', {})['wealth_tier'] = new_tier
+            self.history_manager.record_tier_change(user, old_tier, new_tier, now)
         
         # Save user data
         self.save_user(user_id, user)
@@ -690,7 +801,7 @@ class BalanceManager:
             'income': income,
             'new_balance': user['money'],
             'tier_changed': tier_changed,
-            'new_tier': new_tier if tier_changed else old_tier
+            'new_tier': new_tier or old_tier
         }
     
     def get_financial_summary(self, user_id: str) -> Dict:
@@ -7,8 +7,10 @@ and manage food service businesses from kiosks to restaurant chains.
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 from datetime import datetime, timedelta
+import bisect
+import itertools
 import uuid
 import random
 
@@ -96,6 +98,12 @@ BUSINESS_CONFIGS = {
     }
 }
 
+# Flat per-type tables for values read on every create/daily cycle
+_COST_BY_TYPE = {t: cfg["cost"] for t, cfg in BUSINESS_CONFIGS.items()}
+_BASE_REVENUE_BY_TYPE = {t: cfg["base_revenue"] for t, cfg in BUSINESS_CONFIGS.items()}
+_BASE_RENT_BY_TYPE = {t: cfg["base_rent"] for t, cfg in BUSINESS_CONFIGS.items()}
+_MAX_EMPLOYEES_BY_TYPE = {t: cfg["max_employees"] for t, cfg in BUSINESS_CONFIGS.items()}
+
 EMPLOYEE_CONFIGS = {
     EmployeeType.CHEF: {
         "daily_salary": 5000,
@@ -218,35 +226,77 @@ EVENT_CONFIGS = {
 # DATA MODELS
 # ============================================================================
 
-@dataclass
+# Per-process random prefix + counter: unique across workers and restarts
+_ID_PREFIX = uuid.uuid4().hex[:12]
+_ID_COUNTER = itertools.count()
+
+
+def _new_id() -> str:
+    """Returns a new unique id for employees and events"""
+    return f"{_ID_PREFIX}-{next(_ID_COUNTER)}"
+
+
+# Stored datetimes are naive wall-clock times (as from datetime.now()) counted
+# in seconds from this epoch, so they load back unchanged whatever the server
+# timezone or DST state; .timestamp() would go through the local timezone
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _format_datetime(value: datetime, for_storage: bool) -> Any:
+    """Serializes a datetime: seconds since _EPOCH for storage, ISO string for the API"""
+    if for_storage:
+        return (value - _EPOCH).total_seconds()
+    return value.isoformat()
+
+
+def _parse_datetime(value: Any) -> datetime:
+    """Parses a datetime: stored seconds since _EPOCH, or ISO string (API, older saves)"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return _EPOCH + timedelta(seconds=value)
+
+
+@dataclass(slots=True)
 class Employee:
     """Represents an employee working in a business"""
     employee_id: str
     employee_type: EmployeeType
     hired_at: datetime
+    # Config values resolved once in __post_init__
+    _daily_salary: float = field(init=False, repr=False, compare=False)
+    _quality_bonus: float = field(init=False, repr=False, compare=False)
+    _revenue_multiplier: float = field(init=False, repr=False, compare=False)
+    _rating_bonus: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        config = EMPLOYEE_CONFIGS[self.employee_type]
+        self._daily_salary = config["daily_salary"]
+        self._quality_bonus = config.get("quality_bonus", 0.0)
+        self._revenue_multiplier = config.get("revenue_multiplier", 1.0)
+        self._rating_bonus = config.get("rating_bonus", 0.0)
     
     def get_daily_salary(self) -> float:
         """Returns daily salary cost"""
-        return EMPLOYEE_CONFIGS[self.employee_type]["daily_salary"]
+        return self._daily_salary
     
     def get_quality_bonus(self) -> float:
         """Returns quality improvement (0.0 to 1.0)"""
-        return EMPLOYEE_CONFIGS[self.employee_type].get("quality_bonus", 0.0)
+        return self._quality_bonus
     
     def get_revenue_multiplier(self) -> float:
         """Returns revenue multiplier (1.0 = no change)"""
-        return EMPLOYEE_CONFIGS[self.employee_type].get("revenue_multiplier", 1.0)
+        return self._revenue_multiplier
     
     def get_rating_bonus(self) -> float:
         """Returns rating bonus from this employee"""
-        return EMPLOYEE_CONFIGS[self.employee_type].get("rating_bonus", 0.0)
+        return self._rating_bonus
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary"""
+    def to_dict(self, for_storage: bool = False) -> Dict[str, Any]:
+        """Serialize to dictionary (datetimes as ISO strings, or as floats for storage)"""
         return {
             "employee_id": self.employee_id,
             "employee_type": self.employee_type.value,
-            "hired_at": self.hired_at.isoformat()
+            "hired_at": _format_datetime(self.hired_at, for_storage)
         }
     
     @staticmethod
@@ -255,41 +305,51 @@ class Employee:
         return Employee(
             employee_id=data["employee_id"],
             employee_type=EmployeeType(data["employee_type"]),
-            hired_at=datetime.fromisoformat(data["hired_at"])
+            hired_at=_parse_datetime(data["hired_at"])
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Upgrade:
     """Represents an upgrade purchased for a business"""
     upgrade_type: UpgradeType
     purchased_at: datetime
     expires_at: Optional[datetime] = None
+    # Config values resolved once in __post_init__
+    _cost: float = field(init=False, repr=False, compare=False)
+    _revenue_multiplier: float = field(init=False, repr=False, compare=False)
+    _rating_bonus: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        config = UPGRADE_CONFIGS[self.upgrade_type]
+        self._cost = config["cost"]
+        self._revenue_multiplier = config.get("revenue_multiplier", 1.0)
+        self._rating_bonus = config.get("rating_bonus", 0.0)
     
     def get_cost(self) -> float:
         """Returns purchase cost"""
-        return UPGRADE_CONFIGS[self.upgrade_type]["cost"]
+        return self._cost
     
     def get_revenue_multiplier(self) -> float:
         """Returns revenue multiplier (1.0 = no change)"""
-        return UPGRADE_CONFIGS[self.upgrade_type].get("revenue_multiplier", 1.0)
+        return self._revenue_multiplier
     
     def get_rating_bonus(self) -> float:
         """Returns rating increase"""
-        return UPGRADE_CONFIGS[self.upgrade_type].get("rating_bonus", 0.0)
+        return self._rating_bonus
     
-    def is_active(self) -> bool:
-        """Returns True if upgrade is currently active"""
+    def is_active(self, now: Optional[datetime] = None) -> bool:
+        """Returns True if upgrade is active at `now` (defaults to current time)"""
         if self.expires_at is None:
             return True  # Permanent upgrade
-        return datetime.now() < self.expires_at
+        return (now or datetime.now()) < self.expires_at
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary"""
+    def to_dict(self, for_storage: bool = False) -> Dict[str, Any]:
+        """Serialize to dictionary (datetimes as ISO strings, or as floats for storage)"""
         return {
             "upgrade_type": self.upgrade_type.value,
-            "purchased_at": self.purchased_at.isoformat(),
-            "expires_at": self.expires_at.isoformat() if self.expires_at else None
+            "purchased_at": _format_datetime(self.purchased_at, for_storage),
+            "expires_at": _format_datetime(self.expires_at, for_storage) if self.expires_at else None
         }
     
     @staticmethod
@@ -297,12 +357,12 @@ class Upgrade:
         """Deserialize from dictionary"""
         return Upgrade(
             upgrade_type=UpgradeType(data["upgrade_type"]),
-            purchased_at=datetime.fromisoformat(data["purchased_at"]),
-            expires_at=datetime.fromisoformat(data["expires_at"]) if data.get("expires_at") else None
+            purchased_at=_parse_datetime(data["purchased_at"]),
+            expires_at=_parse_datetime(data["expires_at"]) if data.get("expires_at") else None
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class BusinessEvent:
     """Represents a random event affecting a business"""
     event_id: str
@@ -312,28 +372,24 @@ class BusinessEvent:
     expires_at: Optional[datetime] = None
     is_resolved: bool = False
     outcome_data: Dict[str, Any] = field(default_factory=dict)
+    # Multiplier while unresolved, resolved once in __post_init__
+    _revenue_multiplier: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.outcome == EventOutcome.CLOSURE:
+            self._revenue_multiplier = 0.0  # No revenue during closure
+        elif self.outcome in (EventOutcome.REVENUE_BOOST, EventOutcome.REVENUE_PENALTY,
+                              EventOutcome.REQUIRES_REPAIR):
+            config = EVENT_CONFIGS.get(self.event_type, {})
+            self._revenue_multiplier = config.get("revenue_multiplier", 1.0)
+        else:
+            self._revenue_multiplier = 1.0
     
     def get_revenue_multiplier(self) -> float:
         """Returns revenue multiplier while event is active"""
         if self.is_resolved:
             return 1.0
-        
-        if self.outcome == EventOutcome.CLOSURE:
-            return 0.0  # No revenue during closure
-        
-        if self.outcome == EventOutcome.REVENUE_BOOST:
-            config = EVENT_CONFIGS.get(self.event_type, {})
-            return config.get("revenue_multiplier", 1.0)
-        
-        if self.outcome == EventOutcome.REVENUE_PENALTY:
-            config = EVENT_CONFIGS.get(self.event_type, {})
-            return config.get("revenue_multiplier", 1.0)
-        
-        if self.outcome == EventOutcome.REQUIRES_REPAIR:
-            config = EVENT_CONFIGS.get(self.event_type, {})
-            return config.get("revenue_multiplier", 1.0)
-        
-        return 1.0
+        return self._revenue_multiplier
     
     def get_immediate_cost(self) -> float:
         """Returns immediate cost (fines, repairs)"""
@@ -345,14 +401,14 @@ class BusinessEvent:
         """Returns True if player must take action to resolve"""
         return self.outcome == EventOutcome.REQUIRES_REPAIR
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary"""
+    def to_dict(self, for_storage: bool = False) -> Dict[str, Any]:
+        """Serialize to dictionary (datetimes as ISO strings, or as floats for storage)"""
         return {
             "event_id": self.event_id,
             "event_type": self.event_type.value,
             "outcome": self.outcome.value,
-            "triggered_at": self.triggered_at.isoformat(),
-            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "triggered_at": _format_datetime(self.triggered_at, for_storage),
+            "expires_at": _format_datetime(self.expires_at, for_storage) if self.expires_at else None,
             "is_resolved": self.is_resolved,
             "outcome_data": self.outcome_data
         }
@@ -364,14 +420,14 @@ class BusinessEvent:
             event_id=data["event_id"],
             event_type=EventType(data["event_type"]),
             outcome=EventOutcome(data["outcome"]),
-            triggered_at=datetime.fromisoformat(data["triggered_at"]),
-            expires_at=datetime.fromisoformat(data["expires_at"]) if data.get("expires_at") else None,
+            triggered_at=_parse_datetime(data["triggered_at"]),
+            expires_at=_parse_datetime(data["expires_at"]) if data.get("expires_at") else None,
             is_resolved=data.get("is_resolved", False),
             outcome_data=data.get("outcome_data", {})
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Business:
     """Represents a player's business"""
     business_id: str
@@ -387,35 +443,35 @@ class Business:
     
     def get_max_employees(self) -> int:
         """Returns maximum employee capacity based on business type"""
-        return BUSINESS_CONFIGS[self.business_type]["max_employees"]
+        return _MAX_EMPLOYEES_BY_TYPE[self.business_type]
     
     def get_base_revenue(self) -> float:
         """Returns base daily revenue for business type"""
-        return BUSINESS_CONFIGS[self.business_type]["base_revenue"]
+        return _BASE_REVENUE_BY_TYPE[self.business_type]
     
     def get_base_rent(self) -> float:
         """Returns base daily rent for business type"""
-        return BUSINESS_CONFIGS[self.business_type]["base_rent"]
+        return _BASE_RENT_BY_TYPE[self.business_type]
     
     def calculate_total_investment(self) -> float:
         """Returns total amount invested (initial cost + upgrades)"""
-        initial_cost = BUSINESS_CONFIGS[self.business_type]["cost"]
+        initial_cost = _COST_BY_TYPE[self.business_type]
         upgrade_costs = sum(upgrade.get_cost() for upgrade in self.upgrades)
         return initial_cost + upgrade_costs
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary"""
+    def to_dict(self, for_storage: bool = False) -> Dict[str, Any]:
+        """Serialize to dictionary (datetimes as ISO strings, or as floats for storage)"""
         return {
             "business_id": self.business_id,
             "owner_id": self.owner_id,
             "business_type": self.business_type.value,
-            "created_at": self.created_at.isoformat(),
+            "created_at": _format_datetime(self.created_at, for_storage),
             "inventory_level": self.inventory_level,
             "rating": self.rating,
             "low_inventory_days": self.low_inventory_days,
-            "employees": [emp.to_dict() for emp in self.employees],
-            "upgrades": [upg.to_dict() for upg in self.upgrades],
-            "active_events": [evt.to_dict() for evt in self.active_events]
+            "employees": [emp.to_dict(for_storage) for emp in self.employees],
+            "upgrades": [upg.to_dict(for_storage) for upg in self.upgrades],
+            "active_events": [evt.to_dict(for_storage) for evt in self.active_events]
         }
     
     @staticmethod
@@ -425,7 +481,7 @@ class Business:
             business_id=data["business_id"],
             owner_id=data["owner_id"],
             business_type=BusinessType(data["business_type"]),
-            created_at=datetime.fromisoformat(data["created_at"]),
+            created_at=_parse_datetime(data["created_at"]),
             inventory_level=data.get("inventory_level", 100.0),
             rating=data.get("rating", 3.0),
             low_inventory_days=data.get("low_inventory_days", 0),
@@ -440,7 +496,7 @@ class Business:
 # RESULT TYPE FOR ERROR HANDLING
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Result:
     """Result type for operations that can succeed or fail"""
     success: bool
@@ -478,7 +534,7 @@ class EmployeeManager:
         
         # Create employee
         employee = Employee(
-            employee_id=str(uuid.uuid4()),
+            employee_id=_new_id(),
             employee_type=employee_type,
             hired_at=datetime.now()
         )
@@ -520,18 +576,30 @@ class EmployeeManager:
         """Returns sum of all employee salaries for business"""
         return sum(emp.get_daily_salary() for emp in business.employees)
     
+    def calculate_revenue_multiplier(self, business: Business) -> float:
+        """Returns combined revenue multiplier of all employees"""
+        manager = EmployeeType.MANAGER
+        revenue_multiplier = 1.0
+        for employee in business.employees:
+            # Manager gives revenue multiplier
+            if employee.employee_type is manager:
+                revenue_multiplier *= employee.get_revenue_multiplier()
+        return revenue_multiplier
+    
     def calculate_employee_effects(self, business: Business) -> Dict[str, float]:
         """
         Calculates combined effects of all employees.
         Returns: revenue_multiplier, quality_bonus, rating_bonus
         """
+        manager = EmployeeType.MANAGER
         revenue_multiplier = 1.0
         quality_bonus = 0.0
         rating_bonus = 0.0
         
+        # Enum members are singletons: compare by identity
         for employee in business.employees:
             # Manager gives revenue multiplier
-            if employee.employee_type == EmployeeType.MANAGER:
+            if employee.employee_type is manager:
                 revenue_multiplier *= employee.get_revenue_multiplier()
             
             quality_bonus += employee.get_quality_bonus()
@@ -620,14 +688,15 @@ class UpgradeManager:
                 f"Недостаточно средств. Нужно {cost}₽, есть {user_funds}₽"
             )
         
+        purchased_at = datetime.now()
+        
         # Check for duplicate permanent upgrades
         if config["is_permanent"]:
             for upgrade in business.upgrades:
-                if upgrade.upgrade_type == upgrade_type and upgrade.is_active():
+                if upgrade.upgrade_type == upgrade_type and upgrade.is_active(purchased_at):
                     return Result.fail(f"Улучшение уже куплено: {config['name']}")
         
         # Create upgrade
-        purchased_at = datetime.now()
         expires_at = None
         
         if not config["is_permanent"]:
@@ -649,15 +718,24 @@ class UpgradeManager:
         
         return Result.ok({"upgrade": upgrade, "cost": cost})
     
-    def get_active_upgrades(self, business: Business) -> List[Upgrade]:
-        """Returns list of currently active upgrades (not expired)"""
-        return [upg for upg in business.upgrades if upg.is_active()]
+    def get_active_upgrades(self, business: Business, now: Optional[datetime] = None) -> List[Upgrade]:
+        """Returns list of upgrades active at `now` (not expired)"""
+        now = now or datetime.now()
+        return [upg for upg in business.upgrades
+                if upg.expires_at is None or now < upg.expires_at]
     
     def process_upgrade_expirations(self, business: Business) -> None:
         """Checks and marks expired upgrades as inactive"""
         # Upgrades are checked via is_active() method
         pass
     
+    def calculate_revenue_multiplier(self, business: Business, now: Optional[datetime] = None) -> float:
+        """Returns combined revenue multiplier of all active upgrades"""
+        revenue_multiplier = 1.0
+        for upgrade in self.get_active_upgrades(business, now):
+            revenue_multiplier *= upgrade.get_revenue_multiplier()
+        return revenue_multiplier
+    
     def calculate_upgrade_effects(self, business: Business) -> Dict[str, float]:
         """
         Calculates combined effects of all active upgrades.
@@ -683,34 +761,53 @@ class UpgradeManager:
 class EventManager:
     """Manages random business events"""
     
-    def trigger_random_events(self, business: Business) -> List[BusinessEvent]:
+    # Constant lookup tables built once from EVENT_CONFIGS
+    _EVENT_TABLE = tuple(
+        (event_type, config["probability"], config)
+        for event_type, config in EVENT_CONFIGS.items()
+    )
+    _HEALTH_OUTCOMES = tuple(EVENT_CONFIGS[EventType.HEALTH_INSPECTION]["outcomes"])
+    _HEALTH_CUM_WEIGHTS = tuple(itertools.accumulate(o["weight"] for o in _HEALTH_OUTCOMES))
+    
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        Initialize event manager.
+        
+        Args:
+            rng: Random generator to draw from (own instance by default)
+        """
+        self._rng = rng or random.Random()
+    
+    def trigger_random_events(self, business: Business,
+                              now: Optional[datetime] = None) -> List[BusinessEvent]:
         """
         Randomly triggers business events based on probabilities.
         Returns list of newly triggered events.
         """
         new_events = []
         
-        for event_type, config in EVENT_CONFIGS.items():
-            probability = config["probability"]
-            
+        for event_type, probability, config in self._EVENT_TABLE:
             # Roll for event
-            if random.random() < probability:
-                event = self._create_event(event_type, config)
+            if self._rng.random() < probability:
+                event = self._create_event(event_type, config, now)
                 business.active_events.append(event)
                 new_events.append(event)
         
         return new_events
     
-    def _create_event(self, event_type: EventType, config: Dict[str, Any]) -> BusinessEvent:
+    def _create_event(self, event_type: EventType, config: Dict[str, Any],
+                      now: Optional[datetime] = None) -> BusinessEvent:
         """Creates a business event based on type and config"""
-        event_id = str(uuid.uuid4())
-        triggered_at = datetime.now()
+        event_id = _new_id()
+        triggered_at = now or datetime.now()
         
         # Health Inspection - choose outcome
         if event_type == EventType.HEALTH_INSPECTION:
-            outcomes = config["outcomes"]
-            weights = [o["weight"] for o in outcomes]
-            chosen_outcome = random.choices(outcomes, weights=weights)[0]
+            # Same draw as random.choices(outcomes, weights) without rebuilding weights
+            cum_weights = self._HEALTH_CUM_WEIGHTS
+            index = bisect.bisect(cum_weights, self._rng.random() * cum_weights[-1],
+                                  0, len(cum_weights) - 1)
+            chosen_outcome = self._HEALTH_OUTCOMES[index]
             
             if chosen_outcome["type"] == EventOutcome.FINE:
                 return BusinessEvent(
@@ -763,23 +860,21 @@ class EventManager:
                 outcome_data={"repair_cost": config["repair_cost"]}
             )
     
-    def get_active_events(self, business: Business) -> List[BusinessEvent]:
-        """Returns list of currently active events"""
-        now = datetime.now()
-        active = []
-        
-        for event in business.active_events:
-            if event.is_resolved:
-                continue
-            if event.expires_at and now > event.expires_at:
-                continue
-            active.append(event)
-        
-        return active
+    @staticmethod
+    def _is_active(event: BusinessEvent, now: datetime) -> bool:
+        """Returns True if event is unresolved and not expired at `now`"""
+        if event.is_resolved:
+            return False
+        return not (event.expires_at and now > event.expires_at)
+    
+    def get_active_events(self, business: Business, now: Optional[datetime] = None) -> List[BusinessEvent]:
+        """Returns list of events active at `now`"""
+        now = now or datetime.now()
+        return [event for event in business.active_events if self._is_active(event, now)]
     
-    def process_event_expirations(self, business: Business) -> None:
+    def process_event_expirations(self, business: Business, now: Optional[datetime] = None) -> None:
         """Checks and marks expired events as inactive"""
-        now = datetime.now()
+        now = now or datetime.now()
         
         for event in business.active_events:
             if event.expires_at and now > event.expires_at and not event.is_resolved:
@@ -820,20 +915,29 @@ class EventManager:
         
         return Result.fail("Неизвестное действие")
     
-    def calculate_event_effects(self, business: Business) -> Dict[str, Any]:
+    def calculate_revenue_multiplier(self, business: Business, now: Optional[datetime] = None) -> float:
+        """Returns combined revenue multiplier of all active events"""
+        now = now or datetime.now()
+        revenue_multiplier = 1.0
+        for event in business.active_events:
+            if self._is_active(event, now):
+                revenue_multiplier *= event.get_revenue_multiplier()
+        return revenue_multiplier
+    
+    def calculate_event_effects(self, business: Business, now: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Calculates combined effects of all active events.
         Returns: revenue_multiplier, immediate_costs, closure_days
         """
+        now = now or datetime.now()
         revenue_multiplier = 1.0
         immediate_costs = 0.0
         closure_days = 0
         
-        for event in self.get_active_events(business):
-            event_multiplier = event.get_revenue_multiplier()
-            revenue_multiplier *= event_multiplier
-            
-            immediate_costs += event.get_immediate_cost()
+        for event in business.active_events:
+            if self._is_active(event, now):
+                revenue_multiplier *= event.get_revenue_multiplier()
+                immediate_costs += event.get_immediate_cost()
         
         return {
             "revenue_multiplier": revenue_multiplier,
@@ -846,6 +950,15 @@ class EventManager:
         if event.outcome == EventOutcome.FINE:
             rating_penalty = event.outcome_data.get("rating_penalty", 0)
             business.rating = max(1.0, business.rating - rating_penalty)
+    
+    def apply_events_to_rating(self, business: Business, events: List[BusinessEvent]) -> None:
+        """Applies the combined rating penalty of several fine events at once"""
+        total_penalty = sum(
+            event.outcome_data.get("rating_penalty", 0)
+            for event in events
+            if event.outcome == EventOutcome.FINE
+        )
+        business.rating = max(1.0, business.rating - total_penalty)
 
 
 # ============================================================================
@@ -861,7 +974,7 @@ class RevenueCalculator:
         self.event_manager = EventManager()
         self.inventory_manager = InventoryManager()
     
-    def calculate_daily_revenue(self, business: Business) -> float:
+    def calculate_daily_revenue(self, business: Business, now: Optional[datetime] = None) -> float:
         """
         Calculates total daily revenue for business.
         
@@ -875,31 +988,22 @@ class RevenueCalculator:
         Apply event multipliers (Viral Post: 1.50x, Competitor: 0.80x, etc.)
         Apply inventory penalty (if < 20%: 0.50x)
         """
-        # Base revenue
-        base_revenue = business.get_base_revenue()
-        
-        # Rating multiplier
-        rating_multiplier = business.rating / 3.0
-        
-        revenue = base_revenue * rating_multiplier
-        
-        # Employee effects
-        employee_effects = self.employee_manager.calculate_employee_effects(business)
-        revenue *= employee_effects["revenue_multiplier"]
-        
-        # Upgrade effects
-        upgrade_effects = self.upgrade_manager.calculate_upgrade_effects(business)
-        revenue *= upgrade_effects["revenue_multiplier"]
-        
-        # Event effects
-        event_effects = self.event_manager.calculate_event_effects(business)
-        revenue *= event_effects["revenue_multiplier"]
-        
-        # Inventory penalty
-        inventory_penalty = self.inventory_manager.get_inventory_penalty(business)
-        revenue *= inventory_penalty
-        
-        return revenue
+        # One clock read for both expiry checks
+        now = now or datetime.now()
+        
+        # Closure zeroes the event multiplier: skip the remaining effects
+        event_multiplier = self.event_manager.calculate_revenue_multiplier(business, now)
+        if event_multiplier == 0.0:
+            return 0.0
+        
+        return (
+            business.get_base_revenue()
+            * (business.rating / 3.0)
+            * self.employee_manager.calculate_revenue_multiplier(business)
+            * self.upgrade_manager.calculate_revenue_multiplier(business, now)
+            * event_multiplier
+            * self.inventory_manager.get_inventory_penalty(business)
+        )
     
     def calculate_daily_expenses(self, business: Business) -> float:
         """
@@ -945,25 +1049,27 @@ class BusinessRepository:
         self.get_user_data = get_user_data_func
         self.save_user_data = save_user_data_func
     
+    @staticmethod
+    def _business_index(user_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns user's businesses as {business_id: business_dict}.
+        Older saves keep a list; it is converted in place (order preserved).
+        """
+        businesses = user_data.get("businesses")
+        if businesses is None:
+            businesses = user_data["businesses"] = {}
+        elif isinstance(businesses, list):
+            businesses = user_data["businesses"] = {
+                biz["business_id"]: biz for biz in businesses
+            }
+        return businesses
+    
     def save_business(self, business: Business) -> None:
         """Persists business to database"""
         user_data = self.get_user_data(business.owner_id)
         
-        if "businesses" not in user_data:
-            user_data["businesses"] = []
-        
-        # Find and update existing business or add new one
-        business_dict = business.to_dict()
-        found = False
-        
-        for i, biz in enumerate(user_data["businesses"]):
-            if biz["business_id"] == business.business_id:
-                user_data["businesses"][i] = business_dict
-                found = True
-                break
-        
-        if not found:
-            user_data["businesses"].append(business_dict)
+        # Update existing business or add new one
+        self._business_index(user_data)[business.business_id] = business.to_dict(for_storage=True)
         
         self.save_user_data(business.owner_id, user_data)
     
@@ -974,11 +1080,8 @@ class BusinessRepository:
         if "businesses" not in user_data:
             return None
         
-        for biz_dict in user_data["businesses"]:
-            if biz_dict["business_id"] == business_id:
-                return Business.from_dict(biz_dict)
-        
-        return None
+        biz_dict = self._business_index(user_data).get(business_id)
+        return Business.from_dict(biz_dict) if biz_dict else None
     
     def load_user_businesses(self, user_id: str) -> List[Business]:
         """Loads all businesses for user"""
@@ -987,7 +1090,7 @@ class BusinessRepository:
         if "businesses" not in user_data:
             return []
         
-        return [Business.from_dict(biz) for biz in user_data["businesses"]]
+        return [Business.from_dict(biz) for biz in self._business_index(user_data).values()]
     
     def delete_business(self, business_id: str, user_id: str) -> None:
         """Deletes business from database"""
@@ -996,10 +1099,7 @@ class BusinessRepository:
         if "businesses" not in user_data:
             return
         
-        user_data["businesses"] = [
-            biz for biz in user_data["businesses"]
-            if biz["business_id"] != business_id
-        ]
+        self._business_index(user_data).pop(business_id, None)
         
         self.save_user_data(user_id, user_data)
     
@@ -1013,13 +1113,55 @@ class BusinessRepository:
         """Returns current user funds"""
         user_data = self.get_user_data(user_id)
         return user_data.get("money", 0)
+    
+    def begin_batch(self, user_id: str) -> 'BusinessBatch':
+        """Starts a batch of writes over one user_data snapshot"""
+        return BusinessBatch(self, user_id)
+
+
+class BusinessBatch:
+    """
+    Loads user data once, applies several business/funds updates to it
+    in memory and saves it once on commit().
+    """
+    
+    def __init__(self, repository: BusinessRepository, user_id: str):
+        self.repository = repository
+        self.user_id = user_id
+        self.user_data = repository.get_user_data(user_id)
+    
+    def load_businesses(self) -> List[Business]:
+        """Loads all businesses from the snapshot"""
+        if "businesses" not in self.user_data:
+            return []
+        index = self.repository._business_index(self.user_data)
+        return [Business.from_dict(biz) for biz in index.values()]
+    
+    def save_business(self, business: Business) -> None:
+        """Stores business in the snapshot"""
+        self.repository._business_index(self.user_data)[business.business_id] = business.to_dict(for_storage=True)
+    
+    def pop_business(self, business_id: str) -> Optional[Business]:
+        """Removes business from the snapshot and returns it (None if missing)"""
+        if "businesses" not in self.user_data:
+            return None
+        biz_dict = self.repository._business_index(self.user_data).pop(business_id, None)
+        return Business.from_dict(biz_dict) if biz_dict else None
+    
+    def update_funds(self, amount: float) -> None:
+        """Adds amount to funds in the snapshot"""
+        self.user_data["money"] = self.user_data.get("money", 0) + amount
+    
+    def commit(self) -> None:
+        """Saves the snapshot"""
+        self.repository.save_user_data(self.user_id, self.user_data)
 
 
 # ============================================================================
 # BUSINESS MANAGER (Main Orchestrator)
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class DailyReport:
     """Report of daily business operations"""
     total_revenue: float = 0.0
@@ -1028,17 +1170,18 @@ class DailyReport:
     businesses_processed: int = 0
     new_events: List[BusinessEvent] = field(default_factory=list)
     immediate_costs: float = 0.0
+    business_types: Set[BusinessType] = field(default_factory=set, repr=False)
 
 
 class BusinessManager:
     """Main orchestrator for business operations"""
     
-    def __init__(self, repository: BusinessRepository):
+    def __init__(self, repository: BusinessRepository, rng: Optional[random.Random] = None):
         self.repository = repository
         self.employee_manager = EmployeeManager()
         self.inventory_manager = InventoryManager()
         self.upgrade_manager = UpgradeManager()
-        self.event_manager = EventManager()
+        self.event_manager = EventManager(rng)
         self.revenue_calculator = RevenueCalculator()
     
     def create_business(self, user_id: str, business_type: BusinessType) -> Result:
@@ -1046,7 +1189,7 @@ class BusinessManager:
         Creates a new business for the user.
         Validates funds, deducts cost, initializes business with defaults.
         """
-        cost = BUSINESS_CONFIGS[business_type]["cost"]
+        cost = _COST_BY_TYPE[business_type]
         user_funds = self.repository.get_user_funds(user_id)
         
         # Validate funds
@@ -1090,7 +1233,9 @@ class BusinessManager:
         Sells business, returns 50% of total investment.
         Deletes business and returns sale amount.
         """
-        business = self.repository.load_business(business_id, user_id)
+        # Remove business and credit funds in a single load/save
+        batch = self.repository.begin_batch(user_id)
+        business = batch.pop_business(business_id)
         
         if not business:
             return Result.fail(f"Бизнес не найден: {business_id}")
@@ -1099,11 +1244,8 @@ class BusinessManager:
         total_investment = business.calculate_total_investment()
         sale_price = total_investment * 0.5
         
-        # Add funds to user
-        self.repository.update_user_funds(user_id, sale_price)
-        
-        # Delete business
-        self.repository.delete_business(business_id, user_id)
+        batch.update_funds(sale_price)
+        batch.commit()
         
         return Result.ok({"sale_price": sale_price, "total_investment": total_investment})
     
@@ -1118,7 +1260,12 @@ class BusinessManager:
         Returns summary report of all operations.
         """
         report = DailyReport()
-        businesses = self.get_user_businesses(user_id)
+        # One clock read for every expiry check and new event in this cycle
+        now = datetime.now()
+        
+        # One load and one save for the whole cycle
+        batch = self.repository.begin_batch(user_id)
+        businesses = batch.load_businesses()
         
         for business in businesses:
             # Process inventory
@@ -1127,33 +1274,37 @@ class BusinessManager:
             self.inventory_manager.apply_rating_penalty_for_low_inventory(business)
             
             # Process event expirations
-            self.event_manager.process_event_expirations(business)
+            self.event_manager.process_event_expirations(business, now)
             self.upgrade_manager.process_upgrade_expirations(business)
             
             # Calculate revenue and expenses
-            daily_revenue = self.revenue_calculator.calculate_daily_revenue(business)
+            daily_revenue = self.revenue_calculator.calculate_daily_revenue(business, now)
             daily_expenses = self.revenue_calculator.calculate_daily_expenses(business)
             net_profit = daily_revenue - daily_expenses
             
             # Apply immediate event costs (fines)
-            event_effects = self.event_manager.calculate_event_effects(business)
+            event_effects = self.event_manager.calculate_event_effects(business, now)
             immediate_costs = event_effects["immediate_costs"]
             
             # Apply fines to rating
-            for event in business.active_events:
-                if event.outcome == EventOutcome.FINE and not event.is_resolved:
-                    self.event_manager.apply_event_to_rating(business, event)
+            fines = [
+                event for event in business.active_events
+                if event.outcome == EventOutcome.FINE and not event.is_resolved
+            ]
+            if fines:
+                self.event_manager.apply_events_to_rating(business, fines)
+                for event in fines:
                     event.is_resolved = True
             
             # Update funds
             total_change = net_profit - immediate_costs
-            self.repository.update_user_funds(user_id, total_change)
+            batch.update_funds(total_change)
             
             # Trigger new random events
-            new_events = self.event_manager.trigger_random_events(business)
+            new_events = self.event_manager.trigger_random_events(business, now)
             
             # Save business
-            self.repository.save_business(business)
+            batch.save_business(business)
             
             # Update report
             report.total_revenue += daily_revenue
@@ -1162,30 +1313,37 @@ class BusinessManager:
             report.immediate_costs += immediate_costs
             report.businesses_processed += 1
             report.new_events.extend(new_events)
+            report.business_types.add(business.business_type)
+        
+        # Check achievements on the same snapshot
+        goals_changed = self._check_achievements(batch.user_data, report)
         
-        # Check achievements
-        self._check_achievements(user_id, businesses, report)
+        if businesses or goals_changed:
+            batch.commit()
         
         return report
     
-    def _check_achievements(self, user_id: str, businesses: List[Business], report: DailyReport) -> None:
-        """Check and unlock achievements"""
-        user_data = self.repository.get_user_data(user_id)
+    def _check_achievements(self, user_data: Dict[str, Any], report: DailyReport) -> bool:
+        """Check and unlock achievements; returns True if user_data changed"""
+        # Businessman achievement (100,000₽ total net profit)
+        is_businessman = report.total_net_profit >= 100000
+        # Tycoon achievement (owns Restaurant Chain)
+        has_restaurant_chain = BusinessType.RESTAURANT_CHAIN in report.business_types
         
-        if "completed_goals" not in user_data:
-            user_data["completed_goals"] = []
+        # Nothing can unlock today; skip touching completed_goals
+        if not (is_businessman or has_restaurant_chain):
+            return False
         
-        # Businessman achievement (100,000₽ total net profit)
-        if report.total_net_profit >= 100000 and "businessman" not in user_data["completed_goals"]:
-            user_data["completed_goals"].append("businessman")
-            self.repository.save_user_data(user_id, user_data)
+        changed = False
+        goals = user_data.setdefault("completed_goals", [])
+        completed = set(goals)
         
-        # Tycoon achievement (owns Restaurant Chain)
-        has_restaurant_chain = any(
-            biz.business_type == BusinessType.RESTAURANT_CHAIN
-            for biz in businesses
-        )
+        if is_businessman and "businessman" not in completed:
+            goals.append("businessman")
+            changed = True
+        
+        if has_restaurant_chain and "tycoon" not in completed:
+            goals.append("tycoon")
+            changed = True
         
-        if has_restaurant_chain and "tycoon" not in user_data["completed_goals"]:
-            user_data["completed_goals"].append("tycoon")
-            self.repository.save_user_data(user_id, user_data)
+        return changed
@@ -6,7 +6,9 @@ Defines all professions, career ladders, promotion requirements,
 and salary scales for the career progression system.
 """
 
-PROFESSIONS = {
+from types import MappingProxyType
+
+_PROFESSIONS_RAW = {
     'courier': {
         'id': 'courier',
         'name': 'Courier',
@@ -411,36 +413,53 @@ PROFESSIONS = {
 }
 
 
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Configuration is read-only at runtime; writes raise TypeError
+PROFESSIONS = _freeze(_PROFESSIONS_RAW)
+
+# Lookup tables built once at import: profession -> {level_id: level}
+_PROFESSION_LEVEL_INDEX = {
+    pid: {lvl['id']: lvl for lvl in p['levels']}
+    for pid, p in PROFESSIONS.items()
+}
+_PROFESSION_MAX_LEVEL = {
+    pid: max(idx) for pid, idx in _PROFESSION_LEVEL_INDEX.items()
+}
+_ALL_PROFESSION_IDS = tuple(PROFESSIONS)
+
+
 def get_profession(profession_id):
     """Get profession configuration by ID."""
     return PROFESSIONS.get(profession_id)
 
 
 def get_all_professions():
-    """Get list of all available professions."""
-    return list(PROFESSIONS.keys())
+    """Get all available profession IDs."""
+    return _ALL_PROFESSION_IDS
 
 
 def get_profession_level(profession_id, level_id):
     """Get specific career level configuration."""
-    profession = get_profession(profession_id)
-    if not profession:
+    levels = _PROFESSION_LEVEL_INDEX.get(profession_id)
+    if levels is None:
         return None
-    
-    for level in profession['levels']:
-        if level['id'] == level_id:
-            return level
-    return None
+    return levels.get(level_id)
 
 
 def get_next_level(profession_id, current_level_id):
     """Get next career level or None if at max."""
-    profession = get_profession(profession_id)
-    if not profession:
+    max_level = _PROFESSION_MAX_LEVEL.get(profession_id)
+    if max_level is None or current_level_id >= max_level:
         return None
-    
-    next_level_id = current_level_id + 1
-    return get_profession_level(profession_id, next_level_id)
+    return _PROFESSION_LEVEL_INDEX[profession_id].get(current_level_id + 1)
 
 
 def get_starting_salary(profession_id):
@@ -7,13 +7,135 @@ promotions, and career-related calculations.
 """
 
 import json
+from collections import OrderedDict
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from threading import Lock
+from dataclasses import dataclass, asdict, replace
 from typing import Optional, Dict, List
 import career_config
 
 
-@dataclass
+# SQL statements, written once so the driver's statement cache always sees
+# the same text. Each dialect is spelled out in full (placeholders differ).
+# The upsert uses ON CONFLICT (SQLite 3.24+) so created_at survives a re-pick.
+_SQLITE_SQL = {
+    'get_state': '''
+    SELECT player_id, profession, career_level, work_actions_completed,
+           total_money_earned, promotion_history
+    FROM career_state
+    WHERE player_id = ?
+''',
+    'get_state_light': '''
+    SELECT profession, career_level, work_actions_completed, total_money_earned
+    FROM career_state
+    WHERE player_id = ?
+''',
+    'upsert_state': '''
+    INSERT INTO career_state
+    (player_id, profession, career_level, work_actions_completed,
+     total_money_earned, promotion_history, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (player_id) DO UPDATE
+    SET profession = EXCLUDED.profession,
+        career_level = EXCLUDED.career_level,
+        work_actions_completed = EXCLUDED.work_actions_completed,
+        total_money_earned = EXCLUDED.total_money_earned,
+        promotion_history = EXCLUDED.promotion_history,
+        updated_at = EXCLUDED.updated_at
+''',
+    'update_work': '''
+    UPDATE career_state
+    SET work_actions_completed = work_actions_completed + 1,
+        total_money_earned = total_money_earned + ?,
+        updated_at = ?
+    WHERE player_id = ?
+''',
+    'update_promotion': '''
+    UPDATE career_state
+    SET career_level = ?,
+        promotion_history = ?,
+        updated_at = ?
+    WHERE player_id = ?
+''',
+}
+
+_POSTGRES_SQL = {
+    'get_state': '''
+    SELECT player_id, profession, career_level, work_actions_completed,
+           total_money_earned, promotion_history
+    FROM career_state
+    WHERE player_id = %s
+''',
+    'get_state_light': '''
+    SELECT profession, career_level, work_actions_completed, total_money_earned
+    FROM career_state
+    WHERE player_id = %s
+''',
+    'upsert_state': '''
+    INSERT INTO career_state
+    (player_id, profession, career_level, work_actions_completed,
+     total_money_earned, promotion_history, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (player_id) DO UPDATE
+    SET profession = EXCLUDED.profession,
+        career_level = EXCLUDED.career_level,
+        work_actions_completed = EXCLUDED.work_actions_completed,
+        total_money_earned = EXCLUDED.total_money_earned,
+        promotion_history = EXCLUDED.promotion_history,
+        updated_at = EXCLUDED.updated_at
+''',
+    'update_work': '''
+    UPDATE career_state
+    SET work_actions_completed = work_actions_completed + 1,
+        total_money_earned = total_money_earned + %s,
+        updated_at = %s
+    WHERE player_id = %s
+''',
+    'update_promotion': '''
+    UPDATE career_state
+    SET career_level = %s,
+        promotion_history = %s,
+        updated_at = %s
+    WHERE player_id = %s
+''',
+}
+
+
+def _make_bonus_fn(profession):
+    """Build the work-income bonus function for a profession config."""
+    bonus_multiplier = profession.get('bonus_multiplier', 0)
+    
+    if 'bonus_skill' in profession:
+        # Skill-based bonus (salesperson, it_support)
+        skill_name = profession['bonus_skill']
+        
+        def bonus(base_salary, player_data):
+            skill_level = player_data.get('skills', {}).get(skill_name, 1)
+            return int(base_salary * skill_level * bonus_multiplier)
+    
+    elif 'bonus_stat' in profession:
+        # Stat-based bonus (waiter - mood)
+        stat_name = profession['bonus_stat']
+        
+        def bonus(base_salary, player_data):
+            stat_value = player_data.get(stat_name, 50)
+            return int(base_salary * stat_value * bonus_multiplier)
+    
+    else:
+        def bonus(base_salary, player_data):
+            return 0
+    
+    return bonus
+
+
+# Profession config is read-only, so the bonus branch is picked once at import
+_BONUS_FNS = {
+    profession_id: _make_bonus_fn(career_config.get_profession(profession_id))
+    for profession_id in career_config.get_all_professions()
+}
+
+
+@dataclass(slots=True)
 class CareerState:
     """Represents the current career state of a player."""
     player_id: str  # Changed from int to str to match user_id
@@ -71,21 +193,59 @@ class CareerManager:
     promotion evaluation, and career state management.
     """
     
-    def __init__(self, db_connection, use_postgres=False):
+    def __init__(self, db_connection, use_postgres=False, cache_size=0):
         """
         Initialize the career manager.
         
         Args:
             db_connection: Database connection for persistence
             use_postgres: Whether using PostgreSQL (True) or SQLite (False)
+            cache_size: Max career states kept in the in-process LRU cache
+                (0 disables it; only safe with a single worker process)
         """
         self.db = db_connection
         self.use_postgres = use_postgres
+        self._sql = _POSTGRES_SQL if use_postgres else _SQLITE_SQL
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        # Guards _cache: request threads share one CareerManager
+        self._cache_lock = Lock()
         self._ensure_table_exists()
     
+    @staticmethod
+    def _copy_state(career_state: CareerState) -> CareerState:
+        """Copy a state so callers can't mutate the cached instance."""
+        return replace(career_state, promotion_history=list(career_state.promotion_history))
+    
+    def _cache_get(self, player_id: str) -> Optional[CareerState]:
+        """Return a copy of the cached state (marking it recently used) or None."""
+        with self._cache_lock:
+            cached = self._cache.get(str(player_id))
+            if cached is None:
+                return None
+            self._cache.move_to_end(cached.player_id)
+            return self._copy_state(cached)
+    
+    def _cache_put(self, career_state: CareerState):
+        """Store a state in the LRU cache (write-through after DB commit)."""
+        if self.cache_size <= 0:
+            return
+        state = self._copy_state(career_state)
+        with self._cache_lock:
+            self._cache[state.player_id] = state
+            self._cache.move_to_end(state.player_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
     def _ensure_table_exists(self):
         """Create career_state table if it doesn't exist."""
         cursor = self.db.cursor()
+        
+        if not self.use_postgres:
+            # WAL + NORMAL: one fsync per checkpoint instead of two per commit
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS career_state (
                 player_id TEXT PRIMARY KEY,
@@ -129,48 +289,18 @@ class CareerManager:
         
         # Save to database
         cursor = self.db.cursor()
-        
-        if self.use_postgres:
-            # PostgreSQL syntax
-            cursor.execute('''
-                INSERT INTO career_state 
-                (player_id, profession, career_level, work_actions_completed, 
-                 total_money_earned, promotion_history, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (player_id) DO UPDATE 
-                SET profession = EXCLUDED.profession,
-                    career_level = EXCLUDED.career_level,
-                    work_actions_completed = EXCLUDED.work_actions_completed,
-                    total_money_earned = EXCLUDED.total_money_earned,
-                    promotion_history = EXCLUDED.promotion_history,
-                    updated_at = EXCLUDED.updated_at
-            ''', (
-                str(player_id),
-                profession,
-                0,
-                0,
-                0,
-                json.dumps([]),
-                datetime.now().isoformat()
-            ))
-        else:
-            # SQLite syntax
-            cursor.execute('''
-                INSERT OR REPLACE INTO career_state 
-                (player_id, profession, career_level, work_actions_completed, 
-                 total_money_earned, promotion_history, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(player_id),
-                profession,
-                0,
-                0,
-                0,
-                json.dumps([]),
-                datetime.now().isoformat()
-            ))
+        cursor.execute(self._sql['upsert_state'], (
+            str(player_id),
+            profession,
+            0,
+            0,
+            0,
+            json.dumps([]),
+            datetime.now().isoformat()
+        ))
         
         self.db.commit()
+        self._cache_put(career_state)
         
         return career_state
     
@@ -184,37 +314,45 @@ class CareerManager:
         Returns:
             CareerState object or None if not found
         """
-        cursor = self.db.cursor()
+        cached = self._cache_get(player_id)
+        if cached is not None:
+            return cached
         
-        if self.use_postgres:
-            cursor.execute('''
-                SELECT player_id, profession, career_level, work_actions_completed,
-                       total_money_earned, promotion_history
-                FROM career_state
-                WHERE player_id = %s
-            ''', (str(player_id),))
-        else:
-            cursor.execute('''
-                SELECT player_id, profession, career_level, work_actions_completed,
-                       total_money_earned, promotion_history
-                FROM career_state
-                WHERE player_id = ?
-            ''', (str(player_id),))
+        cursor = self.db.cursor()
+        cursor.execute(self._sql['get_state'], (str(player_id),))
         
         row = cursor.fetchone()
         if not row:
             return None
         
-        data = {
-            'player_id': row[0],
-            'profession': row[1],
-            'career_level': row[2],
-            'work_actions_completed': row[3],
-            'total_money_earned': row[4],
-            'promotion_history': row[5]
-        }
+        # Positional construction in column order (same result as from_dict)
+        career_state = CareerState(
+            str(row[0]), row[1], row[2], row[3], row[4],
+            json.loads(row[5]) if row[5] else []
+        )
+        self._cache_put(career_state)
+        return career_state
+    
+    def _get_career_state_light(self, player_id: str) -> Optional[CareerState]:
+        """
+        Get career state without promotion_history (left empty).
+        
+        For read paths and counter updates that never touch the history:
+        skips fetching and parsing the JSON column. Light states are not
+        cached and must not be used to write promotion_history back.
+        """
+        cached = self._cache_get(player_id)
+        if cached is not None:
+            return cached
+        
+        cursor = self.db.cursor()
+        cursor.execute(self._sql['get_state_light'], (str(player_id),))
+        
+        row = cursor.fetchone()
+        if not row:
+            return None
         
-        return CareerState.from_dict(data)
+        return CareerState(str(player_id), row[0], row[1], row[2], row[3], [])
     
     def record_work_action(self, player_id: str, money_earned: int = 0):
         """
@@ -224,44 +362,23 @@ class CareerManager:
             player_id: Unique identifier for the player (string)
             money_earned: Amount of money earned from this work action
         """
-        career_state = self.get_career_state(player_id)
-        if not career_state:
-            return
-        
-        career_state.work_actions_completed += 1
-        career_state.total_money_earned += money_earned
-        
-        # Save updated state
+        # Increment in SQL: no read needed, concurrent actions don't overwrite each other
         cursor = self.db.cursor()
-        
-        if self.use_postgres:
-            cursor.execute('''
-                UPDATE career_state
-                SET work_actions_completed = %s,
-                    total_money_earned = %s,
-                    updated_at = %s
-                WHERE player_id = %s
-            ''', (
-                career_state.work_actions_completed,
-                career_state.total_money_earned,
-                datetime.now().isoformat(),
-                str(player_id)
-            ))
-        else:
-            cursor.execute('''
-                UPDATE career_state
-                SET work_actions_completed = ?,
-                    total_money_earned = ?,
-                    updated_at = ?
-                WHERE player_id = ?
-            ''', (
-                career_state.work_actions_completed,
-                career_state.total_money_earned,
-                datetime.now().isoformat(),
-                str(player_id)
-            ))
+        cursor.execute(self._sql['update_work'], (
+            money_earned,
+            datetime.now().isoformat(),
+            str(player_id)
+        ))
         
         self.db.commit()
+        
+        # Keep a cached entry (if any) in step with the row
+        if cursor.rowcount:
+            with self._cache_lock:
+                cached = self._cache.get(str(player_id))
+                if cached is not None:
+                    cached.work_actions_completed += 1
+                    cached.total_money_earned += money_earned
     
     def calculate_work_income(self, player_id: str, player_data: dict) -> int:
         """
@@ -274,38 +391,19 @@ class CareerManager:
         Returns:
             Total income amount including base salary and bonuses
         """
-        career_state = self.get_career_state(player_id)
+        career_state = self._get_career_state_light(player_id)
         if not career_state:
             return 0
         
         # Get base salary
         base_salary = career_state.get_base_salary()
         
-        # Get profession config
-        profession = career_config.get_profession(career_state.profession)
-        if not profession:
+        # Apply profession-specific bonus (resolved once per profession)
+        bonus_fn = _BONUS_FNS.get(career_state.profession)
+        if bonus_fn is None:
             return base_salary
         
-        total_income = base_salary
-        
-        # Apply profession-specific bonuses
-        if 'bonus_skill' in profession:
-            # Skill-based bonus (salesperson, it_support)
-            skill_name = profession['bonus_skill']
-            skill_level = player_data.get('skills', {}).get(skill_name, 1)
-            bonus_multiplier = profession.get('bonus_multiplier', 0)
-            bonus = int(base_salary * skill_level * bonus_multiplier)
-            total_income += bonus
-        
-        elif 'bonus_stat' in profession:
-            # Stat-based bonus (waiter - mood)
-            stat_name = profession['bonus_stat']
-            stat_value = player_data.get(stat_name, 50)
-            bonus_multiplier = profession.get('bonus_multiplier', 0)
-            bonus = int(base_salary * stat_value * bonus_multiplier)
-            total_income += bonus
-        
-        return total_income
+        return base_salary + bonus_fn(base_salary, player_data)
     
     def get_energy_cost_multiplier(self, player_id: str) -> float:
         """
@@ -317,7 +415,7 @@ class CareerManager:
         Returns:
             Multiplier to apply to base energy cost (e.g., 0.95 for 5% reduction)
         """
-        career_state = self.get_career_state(player_id)
+        career_state = self._get_career_state_light(player_id)
         if not career_state:
             return 1.0
         
@@ -361,8 +459,8 @@ class CareerManager:
             career_state.career_level
         )
         
-        # Check promotion eligibility
-        promotion_check = self.check_promotion_eligibility(player_id, player_data)
+        # Check promotion eligibility on the state and next level loaded above
+        promotion_check = self._eligibility_report(career_state, next_level, player_data)
         
         result = {
             'has_profession': True,
@@ -417,7 +515,12 @@ class CareerManager:
             career_state.profession,
             career_state.career_level
         )
-        
+        return self._eligibility_report(career_state, next_level, player_data)
+    
+    @staticmethod
+    def _eligibility_report(career_state: CareerState, next_level: Optional[dict],
+                            player_data: dict) -> dict:
+        """Build the check_promotion_eligibility result for an already loaded state."""
         if not next_level:
             return {
                 'eligible': False,
@@ -461,7 +564,7 @@ class CareerManager:
         avg_progress = sum(skills_progress) / len(skills_progress) if skills_progress else 1.0
         result['requirements']['skills'] = {
             'current': player_skills,
-            'required': skill_reqs,
+            'required': dict(skill_reqs),
             'met': skills_met,
             'progress': avg_progress
         }
@@ -494,6 +597,30 @@ class CareerManager:
         
         return result
     
+    @staticmethod
+    def _meets_next_level_requirements(career_state: CareerState, player_data: dict) -> bool:
+        """Same checks as check_promotion_eligibility, stopping at the first unmet one."""
+        next_level = career_config.get_next_level(
+            career_state.profession,
+            career_state.career_level
+        )
+        if not next_level:
+            return False
+        
+        requirements = next_level['requirements']
+        if career_state.work_actions_completed < requirements.get('work_actions', 0):
+            return False
+        if career_state.total_money_earned < requirements.get('money_earned', 0):
+            return False
+        if player_data.get('days_survived', 0) < requirements.get('days_survived', 0):
+            return False
+        
+        player_skills = player_data.get('skills', {})
+        return all(
+            player_skills.get(skill_name, 1) >= required_level
+            for skill_name, required_level in requirements.get('skills', {}).items()
+        )
+    
     def promote_player(self, player_id: str, player_data: dict) -> CareerState:
         """
         Promote player to next career level.
@@ -508,20 +635,20 @@ class CareerManager:
         Raises:
             ValueError: If player is not eligible for promotion
         """
-        # Check eligibility
-        eligibility = self.check_promotion_eligibility(player_id, player_data)
-        if not eligibility['eligible']:
+        career_state = self.get_career_state(player_id)
+        
+        # Check eligibility on the same state that gets promoted
+        if not career_state or not self._meets_next_level_requirements(career_state, player_data):
             raise ValueError('Player is not eligible for promotion')
         
-        career_state = self.get_career_state(player_id)
-        if not career_state:
-            raise ValueError('No career state found')
+        # One timestamp for the history record and updated_at
+        now_iso = datetime.now().isoformat()
         
         # Record promotion in history
         promotion_record = {
             'from_level': career_state.career_level,
             'to_level': career_state.career_level + 1,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso,
             'work_actions_at_promotion': career_state.work_actions_completed,
             'money_earned_at_promotion': career_state.total_money_earned
         }
@@ -532,34 +659,14 @@ class CareerManager:
         
         # Save to database
         cursor = self.db.cursor()
-        
-        if self.use_postgres:
-            cursor.execute('''
-                UPDATE career_state
-                SET career_level = %s,
-                    promotion_history = %s,
-                    updated_at = %s
-                WHERE player_id = %s
-            ''', (
-                career_state.career_level,
-                json.dumps(career_state.promotion_history),
-                datetime.now().isoformat(),
-                str(player_id)
-            ))
-        else:
-            cursor.execute('''
-                UPDATE career_state
-                SET career_level = ?,
-                    promotion_history = ?,
-                    updated_at = ?
-                WHERE player_id = ?
-            ''', (
-                career_state.career_level,
-                json.dumps(career_state.promotion_history),
-                datetime.now().isoformat(),
-                str(player_id)
-            ))
+        cursor.execute(self._sql['update_promotion'], (
+            career_state.career_level,
+            json.dumps(career_state.promotion_history),
+            now_iso,
+            str(player_id)
+        ))
         
         self.db.commit()
+        self._cache_put(career_state)
         
         return career_state
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Одноразовая миграция: удаляет из данных пользователей кэшированные бонусы
+(cached_car_bonus, cached_has_laptop, cached_has_scooter).
+
+Бонусы от машин и бустеров считаются в /api/work по cars и owned_items,
+сохранённые копии устаревали при изменении конфига и больше не читаются.
+"""
+
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
+    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
+
+USE_POSTGRES = DATABASE_URL is not None
+
+STALE_KEYS = ('cached_car_bonus', 'cached_has_laptop', 'cached_has_scooter')
+
+
+def strip_stale_keys(data):
+    """Удаляет устаревшие ключи из данных пользователя; True если что-то удалено"""
+    changed = False
+    for key in STALE_KEYS:
+        if key in data:
+            del data[key]
+            changed = True
+    return changed
+
+
+def drop_cached_bonus_keys():
+    """Проходит по всем пользователям и сохраняет очищенные данные"""
+    
+    if USE_POSTGRES:
+        import psycopg2
+        print("🔄 Подключение к PostgreSQL...")
+        conn = psycopg2.connect(DATABASE_URL)
+        placeholder = '%s'
+    else:
+        import sqlite3
+        DB_PATH = os.getenv('DATABASE_PATH', 'game_data.db')
+        print(f"🔄 Подключение к SQLite ({DB_PATH})...")
+        conn = sqlite3.connect(DB_PATH)
+        placeholder = '?'
+    
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT user_id, data FROM users')
+        rows = cursor.fetchall()
+        
+        updated_count = 0
+        for user_id, raw in rows:
+            data = json.loads(raw)
+            if strip_stale_keys(data):
+                cursor.execute(
+                    f'UPDATE users SET data = {placeholder} WHERE user_id = {placeholder}',
+                    (json.dumps(data), user_id)
+                )
+                updated_count += 1
+        
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        print(f"✅ Обновлено пользователей: {updated_count} из {len(rows)}")
+        print("ℹ️  Если включён USER_CACHE_SIZE - перезапусти приложение")
+        
+    except Exception as e:
+        print(f"❌ Ошибка: {e}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    drop_cached_bonus_keys()
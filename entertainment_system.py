@@ -25,6 +25,11 @@ class RouletteEngine:
         'x10': 0.05      # 5% - x10
     }
     
+    # Пороги и множители считаем один раз, а не на каждом спине
+    _X2_THRESHOLD = PROBABILITIES['loss'] + PROBABILITIES['x2']
+    _X5_THRESHOLD = _X2_THRESHOLD + PROBABILITIES['x5']
+    MULTIPLIERS = {'loss': 0, 'x2': 2, 'x5': 5, 'x10': 10}
+    
     def spin(self, bet: int, luck_level: int = 1) -> Dict:
         """
         Крутит рулетку
@@ -69,9 +74,9 @@ class RouletteEngine:
         
         if rand < self.PROBABILITIES['loss'] - luck_bonus:
             return 'loss'
-        elif rand < self.PROBABILITIES['loss'] + self.PROBABILITIES['x2']:
+        elif rand < self._X2_THRESHOLD:
             return 'x2'
-        elif rand < self.PROBABILITIES['loss'] + self.PROBABILITIES['x2'] + self.PROBABILITIES['x5']:
+        elif rand < self._X5_THRESHOLD:
             return 'x5'
         else:
             return 'x10'
@@ -82,10 +87,12 @@ class RouletteEngine:
             # Разные символы
             return random.sample(self.EMOJIS, 3)
         elif outcome == 'x2':
-            # Два одинаковых
-            symbol = random.choice(self.EMOJIS)
-            reels = [symbol, symbol, random.choice([e for e in self.EMOJIS if e != symbol])]
-            random.shuffle(reels)
+            # Два одинаковых: третий символ - любой другой, на случайной позиции
+            count = len(self.EMOJIS)
+            index = random.randrange(count)
+            symbol = self.EMOJIS[index]
+            reels = [symbol, symbol, symbol]
+            reels[random.randrange(3)] = self.EMOJIS[(index + random.randrange(1, count)) % count]
             return reels
         else:
             # Три одинаковых
@@ -94,8 +101,7 @@ class RouletteEngine:
     
     def _get_multiplier(self, outcome: str) -> int:
         """Возвращает множитель по исходу"""
-        multipliers = {'loss': 0, 'x2': 2, 'x5': 5, 'x10': 10}
-        return multipliers.get(outcome, 0)
+        return self.MULTIPLIERS.get(outcome, 0)
 
 
 class DiceEngine:
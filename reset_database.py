@@ -39,6 +39,7 @@ def reset_database():
             
             print(f"✅ Удалено пользователей: {deleted_count}")
             print("✅ База данных PostgreSQL сброшена!")
+            print("ℹ️  Если включён USER_CACHE_SIZE - перезапусти приложение")
             
         except Exception as e:
             print(f"❌ Ошибка: {e}")
@@ -63,6 +64,7 @@ def reset_database():
             
             print(f"✅ Удалено пользователей: {deleted_count}")
             print("✅ База данных SQLite сброшена!")
+            print("ℹ️  Если включён USER_CACHE_SIZE - перезапусти приложение")
             
         except Exception as e:
             print(f"❌ Ошибка: {e}")
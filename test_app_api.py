@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+API Tests for the Flask app
+
+These tests call the endpoints through Flask's test client against a
+throwaway SQLite database.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import uuid
+from collections import Counter
+
+import pytest
+
+# app.py connects to the database at import time
+os.environ.setdefault('DATABASE_PATH', os.path.join(tempfile.mkdtemp(), 'test_game_data.db'))
+os.environ.pop('DATABASE_URL', None)
+
+import app as app_module
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def client():
+    """Flask test client with rate limits switched off"""
+    app_module.limiter.enabled = False
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def user_id():
+    """Fresh user id per test (created on first request)"""
+    return f"test_{uuid.uuid4().hex}"
+
+
+# ============================================================================
+# RESPONSE SHAPE TESTS
+# ============================================================================
+
+class TestLightResponses:
+    """Unit tests for buy_food, take_rest and random_event responses"""
+
+    @pytest.mark.parametrize('endpoint, fields', [
+        ('/api/buy_food', {'money', 'mood', 'health'}),
+        ('/api/take_rest', {'energy', 'mood', 'health', 'rest_count_today'}),
+        ('/api/random_event', {'money', 'mood'}),
+    ])
+    def test_response_keeps_user_and_adds_changes(self, client, user_id, endpoint, fields):
+        """Test that the full 'user' is still returned alongside 'changes'"""
+        response = client.post(endpoint, json={'user_id': user_id})
+        assert response.status_code == 200
+
+        body = response.get_json()
+        assert 'message' in body
+        assert set(body['changes']) == fields
+        for field in fields:
+            assert body['user'][field] == body['changes'][field]
+
+        state = client.get(f'/api/user/{user_id}').get_json()
+        for field in fields:
+            assert state[field] == body['changes'][field]
+
+
+class TestLegacyUserData:
+    """Unit tests for loading partial or older saved users"""
+
+    @pytest.mark.parametrize('skills', [None, [], ['speed', 3], 'speed', {'speed': 4}])
+    def test_partial_blob_gets_defaults(self, client, user_id, skills):
+        """Test that missing fields and a broken skills value are backfilled"""
+        app_module.save_user_data(user_id, {'money': 700, 'skills': skills, 'cars': None})
+
+        response = client.get(f'/api/user/{user_id}')
+        assert response.status_code == 200
+
+        user = response.get_json()
+        assert user['money'] == 700
+        assert user['cars'] == []
+        assert user['current_job'] == 'delivery'
+        expected = dict(app_module.default_user_data()['skills'])
+        if isinstance(skills, dict):
+            expected.update(skills)
+        assert user['skills'] == expected
+
+    def test_work_on_legacy_blob(self, client, user_id):
+        """Test that a handler runs on a user saved without skills or items"""
+        app_module.save_user_data(user_id, {'money': 100, 'skills': None, 'owned_items': None})
+
+        response = client.post('/api/work', json={'user_id': user_id})
+        assert response.status_code == 200
+
+
+# ============================================================================
+# USER CACHE TESTS
+# ============================================================================
+
+@pytest.fixture
+def user_cache(monkeypatch):
+    """Enables the user data LRU with room for two users"""
+    monkeypatch.setattr(app_module, 'USER_CACHE_SIZE', 2)
+    app_module.user_cache.clear()
+    yield app_module.user_cache
+    app_module.user_cache.clear()
+
+
+def write_money_behind_cache(user_id, money):
+    """Changes a stored user directly in SQLite, bypassing the app"""
+    with sqlite3.connect(app_module.DB_PATH) as conn:
+        row = conn.execute('SELECT data FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        data = json.loads(row[0])
+        data['money'] = money
+        conn.execute('UPDATE users SET data = ? WHERE user_id = ?', (json.dumps(data), user_id))
+
+
+class TestUserCache:
+    """Unit tests for the user data LRU cache"""
+
+    def test_cache_hit_skips_database(self, user_cache, user_id):
+        """Test that a cached user is served without reading the row again"""
+        app_module.save_user_data(user_id, {'money': 100})
+        assert app_module.load_user_data(user_id) == {'money': 100}
+
+        write_money_behind_cache(user_id, 999)
+        assert app_module.load_user_data(user_id) == {'money': 100}
+
+    def test_loaded_copies_are_independent(self, user_cache, user_id):
+        """Test that callers cannot mutate the cached entry"""
+        app_module.save_user_data(user_id, {'money': 100})
+        app_module.load_user_data(user_id)['money'] = 0
+
+        assert app_module.load_user_data(user_id) == {'money': 100}
+
+    def test_eviction_at_cache_size(self, user_cache):
+        """Test that the least recently used user is evicted past USER_CACHE_SIZE"""
+        first, second, third = (f"test_{uuid.uuid4().hex}" for _ in range(3))
+        for uid in (first, second):
+            app_module.save_user_data(uid, {'money': 1})
+        app_module.load_user_data(first)
+        app_module.save_user_data(third, {'money': 1})
+
+        assert list(user_cache) == [first, third]
+        write_money_behind_cache(second, 2)
+        assert app_module.load_user_data(second) == {'money': 2}
+
+    def test_cache_disabled_at_zero(self, user_id, monkeypatch):
+        """Test that nothing is cached when USER_CACHE_SIZE is 0"""
+        monkeypatch.setattr(app_module, 'USER_CACHE_SIZE', 0)
+        app_module.save_user_data(user_id, {'money': 100})
+        write_money_behind_cache(user_id, 999)
+
+        assert user_id not in app_module.user_cache
+        assert app_module.load_user_data(user_id) == {'money': 999}
+
+    def test_reset_user_drops_cached_entry(self, client, user_cache, user_id):
+        """Test that /api/reset removes the user from the cache"""
+        app_module.save_user_data(user_id, {'money': 100})
+
+        assert client.post(f'/api/reset/{user_id}').status_code == 200
+        assert user_id not in user_cache
+        assert app_module.load_user_data(user_id) is None
+
+    def test_admin_reset_clears_cache(self, client, user_cache, user_id, monkeypatch):
+        """Test that the admin database reset empties the cache"""
+        monkeypatch.setenv('ADMIN_PASSWORD', 'test-password')
+        app_module.save_user_data(user_id, {'money': 100})
+
+        response = client.post('/api/admin/reset_database', json={'password': 'test-password'})
+        assert response.status_code == 200
+        assert len(user_cache) == 0
+        assert app_module.load_user_data(user_id) is None
+
+
+# ============================================================================
+# WORK EVENT ROLL TESTS
+# ============================================================================
+
+class TestRollWorkEvent:
+    """Unit tests for roll_work_event"""
+
+    def test_seeded_distribution(self):
+        """Test that events fire at event_chance and every event is equally likely"""
+        rng = random.Random(42)
+        draws = 60000
+        event_chance = 0.5
+        counts = Counter(app_module.roll_work_event(event_chance, rng) for _ in range(draws))
+
+        fired = draws - counts[None]
+        assert abs(fired / draws - event_chance) < 0.01
+        expected = fired / len(app_module.EVENTS)
+        assert set(counts) - {None} == set(range(len(app_module.EVENTS)))
+        for idx in range(len(app_module.EVENTS)):
+            assert abs(counts[idx] - expected) < expected * 0.1
+
+    def test_same_seed_same_events(self):
+        """Test that equally seeded generators roll the same events"""
+        first, second = random.Random(7), random.Random(7)
+        assert ([app_module.roll_work_event(0.3, first) for _ in range(200)] ==
+                [app_module.roll_work_event(0.3, second) for _ in range(200)])
+
+    def test_edge_chances(self):
+        """Test that chance 0 never fires and chance 1 always does"""
+        rng = random.Random(0)
+        assert all(app_module.roll_work_event(0.0, rng) is None for _ in range(100))
+        assert all(0 <= app_module.roll_work_event(1.0, rng) < len(app_module.EVENTS)
+                   for _ in range(100))
+
+
+# ============================================================================
+# BUSINESS SHAPE TESTS
+# ============================================================================
+
+class TestBusinessResponses:
+    """Unit tests for how businesses appear in API responses"""
+
+    def test_user_and_business_endpoints_return_iso_lists(self, client, user_id):
+        """Test that the stored business index is returned as a list with ISO dates"""
+        user = client.get(f'/api/user/{user_id}').get_json()
+        user['money'] = 10_000_000
+        app_module.save_user_data(user_id, user)
+
+        created = client.post('/api/business/create',
+                              json={'user_id': user_id, 'business_type': 'kiosk'}).get_json()
+        business_id = created['business']['business_id']
+        assert isinstance(created['business']['created_at'], str)
+
+        stored = app_module.load_user_data(user_id)['businesses']
+        assert isinstance(stored, dict)
+        assert isinstance(stored[business_id]['created_at'], float)
+
+        user = client.get(f'/api/user/{user_id}').get_json()
+        assert isinstance(user['businesses'], list)
+        assert [b['business_id'] for b in user['businesses']] == [business_id]
+        assert user['businesses'][0]['created_at'] == created['business']['created_at']
+
+        listed = client.get('/api/business/list', query_string={'user_id': user_id}).get_json()
+        assert listed['businesses'][0]['created_at'] == created['business']['created_at']
+
+        detail = client.get(f'/api/business/{business_id}', query_string={'user_id': user_id}).get_json()
+        assert detail['created_at'] == created['business']['created_at']
+
+        rest = client.post('/api/take_rest', json={'user_id': user_id}).get_json()
+        assert rest['user']['businesses'] == user['businesses']
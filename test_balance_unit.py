@@ -10,7 +10,7 @@ from balance_system import (
     ExpenseCalculator, WealthTierManager, DebtTracker,
     NegativeEventManager, FinancialHistoryManager, BalanceManager
 )
-from balance_config import DAILY_EXPENSES, JOB_INCOME, WEALTH_TIERS
+from balance_config import DAILY_EXPENSES, JOB_INCOME, WEALTH_TIERS, DEBT_SETTINGS
 
 
 # ============================================================================
@@ -150,7 +150,13 @@ class TestWealthTierManager:
         manager = WealthTierManager()
         assert manager.get_wealth_tier(-500) == 'poor'
         assert manager.get_wealth_tier(-5000) == 'poor'
-    
+
+    def test_fractional_balance_between_tiers(self):
+        """Test that fractional balances above a tier's max move up a tier"""
+        manager = WealthTierManager()
+        assert manager.get_wealth_tier(3000.5) == 'middle'
+        assert manager.get_wealth_tier(10000.5) == 'rich'
+
     def test_expense_multipliers(self):
         """Test correct multipliers for each tier"""
         manager = WealthTierManager()
@@ -159,6 +165,14 @@ class TestWealthTierManager:
         assert manager.get_expense_multiplier('middle') == 1.5
         assert manager.get_expense_multiplier('rich') == 2.0
     
+    def test_expense_multiplier_reads_current_settings(self, monkeypatch):
+        """Test that changes to WEALTH_TIERS multipliers take effect"""
+        monkeypatch.setitem(WEALTH_TIERS['middle'], 'multiplier', 3.0)
+        manager = WealthTierManager()
+        
+        assert manager.get_expense_multiplier('middle') == 3.0
+        assert manager.get_expense_multiplier('unknown') == 1.0
+    
     def test_check_tier_change_no_change(self):
         """Test tier change detection when tier doesn't change"""
         manager = WealthTierManager()
@@ -195,6 +209,24 @@ class TestWealthTierManager:
         result = manager.check_tier_change(user_data, 2000)
         assert result == 'poor'
 
+    def test_check_tier_change_fast_uses_stored_tier(self):
+        """Test tier change check against a stored tier"""
+        manager = WealthTierManager()
+
+        assert manager.check_tier_change_fast('middle', 5000) is None
+        assert manager.check_tier_change_fast('poor', 12000) == 'rich'
+
+    def test_apply_job_income_records_tier_change(self):
+        """Test that income crossing a tier bound updates stored tier"""
+        user = {'money': 2950, 'balance_data': {'wealth_tier': 'poor'}}
+        manager = BalanceManager(lambda user_id: user, lambda user_id, data: None)
+
+        result = manager.apply_job_income('u1', 'delivery')
+
+        assert result['tier_changed'] is True
+        assert result['new_tier'] == 'middle'
+        assert user['balance_data']['wealth_tier'] == 'middle'
+
 
 # ============================================================================
 # DEBT TRACKER TESTS
@@ -217,6 +249,16 @@ class TestDebtTracker:
         assert tracker.get_debt_amount(500) == 0.0
         assert tracker.get_debt_amount(0) == 0.0
     
+    def test_update_debt_returns_debt_state(self):
+        """Test that update_debt reports debt state and updates days"""
+        tracker = DebtTracker()
+        balance_data = {'debt_days': 2}
+
+        assert tracker.update_debt(-300, balance_data) == (True, 3, 300)
+        assert balance_data['debt_days'] == 3
+        assert tracker.update_debt(100, balance_data) == (False, 0, 0.0)
+        assert balance_data['debt_days'] == 0
+
     def test_track_debt_increments_days(self):
         """Test that debt days increment when balance is negative"""
         tracker = DebtTracker()
@@ -292,6 +334,24 @@ class TestDebtTracker:
         assert tracker.get_event_probability_modifier(3) == 0.40
         assert tracker.get_event_probability_modifier(5) == 0.40
         assert tracker.get_event_probability_modifier(10) == 0.40
+    
+    def test_collector_cost_reads_current_settings(self, monkeypatch):
+        """Test that a changed collector_percentage applies to new trackers"""
+        monkeypatch.setitem(DEBT_SETTINGS, 'collector_percentage', 0.5)
+        tracker = DebtTracker()
+        
+        assert tracker.calculate_collector_cost(1000) == 500.0
+    
+    def test_event_probability_reads_current_settings(self, monkeypatch):
+        """Test that changes to DEBT_SETTINGS/EVENT_PROBABILITY take effect"""
+        from balance_config import EVENT_PROBABILITY
+        
+        monkeypatch.setitem(DEBT_SETTINGS, 'high_probability_days', 5)
+        monkeypatch.setitem(EVENT_PROBABILITY, 'debt_3_days', 0.9)
+        tracker = DebtTracker()
+        
+        assert tracker.get_event_probability_modifier(4) == 0.25
+        assert tracker.get_event_probability_modifier(5) == 0.9
 
 
 # ============================================================================
@@ -349,6 +409,19 @@ class TestNegativeEventManager:
         assert result['new_balance'] == 4500
         assert result['event_type'] == 'fine'
 
+    def test_seeded_rng_is_reproducible(self):
+        """Test that managers with equally seeded generators roll the same events"""
+        import random
+
+        rolls = []
+        for _ in range(2):
+            manager = NegativeEventManager(random.Random(42))
+            event = manager.select_random_event()
+            rolls.append((manager.should_trigger_event(0.5), event['type'],
+                          manager.calculate_event_cost(event)))
+
+        assert rolls[0] == rolls[1]
+
 
 # ============================================================================
 # FINANCIAL HISTORY MANAGER TESTS
@@ -450,6 +523,104 @@ class TestFinancialHistoryManager:
         assert 'events' in history
         assert 'tier_changes' in history
 
+    def test_records_use_passed_timestamp(self):
+        """Test that recorders stamp records with the passed time"""
+        from datetime import datetime
+
+        manager = FinancialHistoryManager()
+        user_data = {'money': 5000}
+        now = datetime.now()
+
+        manager.record_daily_income(user_data, {'source': 'delivery', 'amount': 50}, now)
+        manager.record_tier_change(user_data, 'poor', 'middle', now)
+
+        history = user_data['financial_history']
+        assert history['income'][0]['date'] == now.isoformat()
+        assert history['tier_changes'][0]['date'] == now.isoformat()
+
+    def test_cleanup_drops_expired_prefix(self):
+        """Test that cleanup removes only records older than max_days"""
+        from datetime import datetime, timedelta
+
+        manager = FinancialHistoryManager()
+        now = datetime.now()
+        user_data = {'money': 5000}
+        old_dates = [now - timedelta(days=d) for d in (40, 35, 10, 1)]
+        for date in old_dates:
+            manager.record_negative_event(user_data, {
+                'event_type': 'fine', 'cost': 500, 'date': date.isoformat()
+            }, date)
+
+        events = user_data['financial_history']['events']
+        assert [e['date'] for e in events] == [d.isoformat() for d in old_dates[2:]]
+
+    def test_get_history_filters_by_stored_timestamp(self):
+        """Test that records carry 'ts' and get_history filters on it"""
+        from datetime import datetime, timedelta
+
+        manager = FinancialHistoryManager()
+        now = datetime.now()
+        user_data = {'money': 5000}
+        for days_ago in (20, 2):
+            date = now - timedelta(days=days_ago)
+            manager.record_negative_event(user_data, {
+                'event_type': 'fine', 'cost': 500, 'date': date.isoformat()
+            }, date)
+
+        events = user_data['financial_history']['events']
+        assert all('ts' in e for e in events)
+        assert len(manager.get_history(user_data, days=7)['events']) == 1
+
+    def test_undated_records_are_kept_without_timestamp(self):
+        """Test that records without a date get no 'ts' and do not block cleanup"""
+        import json
+        from datetime import datetime, timedelta
+
+        manager = FinancialHistoryManager()
+        now = datetime.now()
+        user_data = {'money': 5000}
+        manager.record_negative_event(user_data, {'event_type': 'fine', 'cost': 100})
+        old = now - timedelta(days=manager.max_days + 5)
+        manager.record_negative_event(user_data, {
+            'event_type': 'fine', 'cost': 200, 'date': old.isoformat()
+        }, old)
+        manager.record_negative_event(user_data, {
+            'event_type': 'fine', 'cost': 300, 'date': now.isoformat()
+        }, now)
+
+        events = user_data['financial_history']['events']
+        assert [e['cost'] for e in events] == [100, 300]
+        assert 'ts' not in events[0]
+        json.dumps(user_data, allow_nan=False)
+        assert len(manager.get_history(user_data, days=7)['events']) == 2
+
+    def test_recorded_copy_is_stamped_with_now(self):
+        """Test that 'ts' comes from now and the caller's dict is not modified"""
+        from datetime import datetime
+
+        manager = FinancialHistoryManager()
+        now = datetime(2024, 3, 1, 12, 0)
+        user_data = {'money': 5000}
+        expenses = {'total': 300, 'date': 'not a date'}
+        manager.record_daily_expenses(user_data, expenses, now)
+
+        assert expenses == {'total': 300, 'date': 'not a date'}
+        assert user_data['financial_history']['expenses'][0]['ts'] == now.timestamp()
+
+    def test_cap_by_count_keeps_last_records(self, monkeypatch):
+        """Test that count capping keeps only the newest max_records"""
+        from balance_config import HISTORY_SETTINGS
+
+        monkeypatch.setitem(HISTORY_SETTINGS, 'cap_by_count', True)
+        monkeypatch.setitem(HISTORY_SETTINGS, 'max_records', 3)
+        manager = FinancialHistoryManager()
+        user_data = {'money': 5000}
+        for amount in range(5):
+            manager.record_daily_income(user_data, {'source': 'delivery', 'amount': amount})
+
+        income = user_data['financial_history']['income']
+        assert [r['amount'] for r in income] == [2, 3, 4]
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
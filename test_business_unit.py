@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Unit Tests for Business System
+
+These tests verify specific examples and edge cases.
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from business_system import (
+    Business, BusinessRepository, BusinessManager, BusinessType,
+    EmployeeType, UpgradeType
+)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def store():
+    """In-memory user data store; values round-trip through JSON like the DB"""
+    return {}
+
+
+@pytest.fixture
+def manager(store):
+    """BusinessManager backed by the in-memory store"""
+    def get_user_data(user_id):
+        return json.loads(json.dumps(store.get(user_id, {})))
+
+    def save_user_data(user_id, user_data):
+        store[user_id] = json.loads(json.dumps(user_data))
+
+    return BusinessManager(BusinessRepository(get_user_data, save_user_data), rng=random.Random(0))
+
+
+def legacy_business(business_id, business_type):
+    """Business dict as older saves wrote it: list entry with ISO dates"""
+    return {
+        "business_id": business_id,
+        "owner_id": "old",
+        "business_type": business_type,
+        "created_at": "2024-01-01T10:00:00",
+        "inventory_level": 80.0,
+        "rating": 4.0,
+        "low_inventory_days": 0,
+        "employees": [{
+            "employee_id": f"{business_id}-emp",
+            "employee_type": EmployeeType.CASHIER.value,
+            "hired_at": "2024-01-02T09:30:00"
+        }],
+        "upgrades": [{
+            "upgrade_type": UpgradeType.ADVERTISING.value,
+            "purchased_at": "2024-01-03T12:00:00",
+            "expires_at": None
+        }],
+        "active_events": []
+    }
+
+
+# ============================================================================
+# LEGACY FORMAT TESTS
+# ============================================================================
+
+class TestLegacyBusinessData:
+    """Unit tests for loading businesses saved in the old list format"""
+
+    def test_legacy_list_converts_to_index_and_round_trips(self, store, manager):
+        """Test that daily operations and selling convert a legacy list to an index"""
+        store["old"] = {
+            "money": 100000,
+            "businesses": [
+                legacy_business("b1", BusinessType.KIOSK.value),
+                legacy_business("b2", BusinessType.CAFE.value)
+            ]
+        }
+
+        report = manager.process_daily_operations("old")
+        assert report.businesses_processed == 2
+
+        businesses = store["old"]["businesses"]
+        assert isinstance(businesses, dict)
+        assert list(businesses) == ["b1", "b2"]
+        assert all(biz["business_id"] == bid for bid, biz in businesses.items())
+
+        b2 = manager.get_business("b2", "old")
+        assert b2.created_at == datetime(2024, 1, 1, 10, 0)
+        assert b2.employees[0].hired_at == datetime(2024, 1, 2, 9, 30)
+        assert b2.upgrades[0].purchased_at == datetime(2024, 1, 3, 12, 0)
+        assert Business.from_dict(json.loads(json.dumps(b2.to_dict()))).to_dict() == b2.to_dict()
+
+        b1 = manager.get_business("b1", "old")
+        money_before = store["old"]["money"]
+        result = manager.sell_business("b1", "old")
+        assert result.success
+        assert result.data["sale_price"] == b1.calculate_total_investment() * 0.5
+        assert store["old"]["money"] == money_before + result.data["sale_price"]
+        assert list(store["old"]["businesses"]) == ["b2"]
+        assert [b.business_id for b in manager.get_user_businesses("old")] == ["b2"]
+
+    def test_sell_converts_legacy_list(self, store, manager):
+        """Test that selling straight from a legacy list leaves an index behind"""
+        store["old"] = {
+            "money": 0,
+            "businesses": [legacy_business("b1", BusinessType.KIOSK.value)]
+        }
+
+        assert manager.sell_business("b1", "old").success
+        assert store["old"]["businesses"] == {}
+        assert not manager.sell_business("b1", "old").success
+
+
+# ============================================================================
+# SERIALIZATION TESTS
+# ============================================================================
+
+@pytest.fixture
+def dst_timezone(monkeypatch):
+    """Runs the test with the process timezone set to one that observes DST"""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available on this platform")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def business_at(moment):
+    """Business whose every datetime field is `moment`"""
+    business = Business.from_dict(legacy_business("b1", BusinessType.CAFE.value))
+    business.created_at = moment
+    business.employees[0].hired_at = moment
+    business.upgrades[0].purchased_at = moment
+    business.upgrades[0].expires_at = moment + timedelta(days=7)
+    return business
+
+
+class TestBusinessSerialization:
+    """Unit tests for Business.to_dict/from_dict"""
+
+    @pytest.mark.parametrize("moment", [
+        datetime(2024, 3, 31, 2, 30),               # skipped by the spring DST change
+        datetime(2024, 10, 27, 2, 30),              # repeated by the autumn DST change
+        datetime(2024, 10, 27, 2, 30, 0, 123456),
+    ])
+    def test_storage_round_trip_across_dst(self, dst_timezone, moment):
+        """Test that stored datetimes load back unchanged around DST changes"""
+        business = business_at(moment)
+        stored = json.loads(json.dumps(business.to_dict(for_storage=True)))
+
+        assert isinstance(stored["created_at"], float)
+        loaded = Business.from_dict(stored)
+        assert loaded.created_at == moment
+        assert loaded.employees[0].hired_at == moment
+        assert loaded.upgrades[0].purchased_at == moment
+        assert loaded.upgrades[0].expires_at == moment + timedelta(days=7)
+
+    def test_api_dict_uses_iso_strings(self):
+        """Test that the API form keeps ISO strings and loads back too"""
+        moment = datetime(2024, 10, 27, 2, 30)
+        api = business_at(moment).to_dict()
+
+        assert api["created_at"] == moment.isoformat()
+        assert api["employees"][0]["hired_at"] == moment.isoformat()
+        assert api["upgrades"][0]["expires_at"] == (moment + timedelta(days=7)).isoformat()
+        assert Business.from_dict(api).to_dict() == api
+
+    def test_saved_business_is_stored_as_floats(self, store, manager):
+        """Test that the repository writes the storage form"""
+        store["u"] = {"money": 10_000_000}
+        business = manager.create_business("u", BusinessType.KIOSK).data
+
+        stored = store["u"]["businesses"][business.business_id]
+        assert isinstance(stored["created_at"], float)
+        assert manager.get_business(business.business_id, "u").to_dict() == business.to_dict()
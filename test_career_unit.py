@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Unit Tests for Career System
+
+These tests verify specific examples and edge cases.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+from career_system import CareerManager, CareerState, _SQLITE_SQL, _POSTGRES_SQL
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(params=[0, 4], ids=['cache_off', 'cache_on'])
+def managers(request):
+    """CareerManager under test plus an uncached reader on the same database"""
+    db = sqlite3.connect(':memory:', check_same_thread=False)
+    manager = CareerManager(db, use_postgres=False, cache_size=request.param)
+    db_reader = CareerManager(db, use_postgres=False, cache_size=0)
+    yield manager, db_reader
+    db.close()
+
+
+PROMOTABLE_PLAYER = {
+    'days_survived': 100,
+    'skills': {'speed': 10, 'luck': 10, 'charisma': 10, 'intelligence': 10}
+}
+
+
+# ============================================================================
+# CACHE CONSISTENCY TESTS
+# ============================================================================
+
+class TestCareerStateCache:
+    """Unit tests for the career state LRU cache"""
+
+    def test_select_profession_matches_database(self, managers):
+        """Test that the state after select_profession matches the stored row"""
+        manager, db_reader = managers
+        manager.select_profession('p1', 'courier')
+
+        assert manager.get_career_state('p1') == db_reader.get_career_state('p1')
+        assert manager.get_career_state('p1').career_level == 0
+
+    def test_record_work_action_matches_database(self, managers):
+        """Test that cached counters follow the increment UPDATE"""
+        manager, db_reader = managers
+        manager.select_profession('p1', 'courier')
+        manager.get_career_state('p1')
+        for _ in range(3):
+            manager.record_work_action('p1', 500)
+
+        state = manager.get_career_state('p1')
+        assert state == db_reader.get_career_state('p1')
+        assert (state.work_actions_completed, state.total_money_earned) == (3, 1500)
+
+    def test_record_work_action_without_state_is_noop(self, managers):
+        """Test that work for a player without a career creates nothing"""
+        manager, db_reader = managers
+        manager.record_work_action('nobody', 500)
+
+        assert manager.get_career_state('nobody') is None
+        assert db_reader.get_career_state('nobody') is None
+
+    def test_promote_player_matches_database(self, managers):
+        """Test that the promoted state and history match the stored row"""
+        manager, db_reader = managers
+        manager.select_profession('p1', 'courier')
+        for _ in range(20):
+            manager.record_work_action('p1', 500)
+
+        manager.promote_player('p1', PROMOTABLE_PLAYER)
+
+        state = manager.get_career_state('p1')
+        assert state == db_reader.get_career_state('p1')
+        assert state.career_level == 1
+        assert len(state.promotion_history) == 1
+
+    def test_returned_state_does_not_alias_cache(self, managers):
+        """Test that mutating a returned state does not change later reads"""
+        manager, db_reader = managers
+        manager.select_profession('p1', 'courier')
+
+        state = manager.get_career_state('p1')
+        state.career_level = 5
+        state.promotion_history.append({'from_level': 0})
+
+        assert manager.get_career_state('p1') == db_reader.get_career_state('p1')
+
+    def test_cache_is_bounded(self):
+        """Test that the cache evicts the least recently used states"""
+        db = sqlite3.connect(':memory:')
+        manager = CareerManager(db, use_postgres=False, cache_size=2)
+        for player_id in ('p1', 'p2', 'p3'):
+            manager.select_profession(player_id, 'courier')
+
+        assert list(manager._cache) == ['p2', 'p3']
+        assert manager.get_career_state('p1').player_id == 'p1'
+        assert list(manager._cache) == ['p3', 'p1']
+
+    def test_concurrent_reads_and_writes(self):
+        """Test that threads sharing the manager do not break the LRU"""
+        manager = CareerManager(sqlite3.connect(':memory:'), use_postgres=False, cache_size=3)
+        player_ids = [f'p{i}' for i in range(8)]
+        errors = []
+
+        def worker(offset):
+            try:
+                for n in range(2000):
+                    player_id = player_ids[(n + offset) % len(player_ids)]
+                    manager._cache_get(player_id)
+                    manager._cache_put(CareerState(player_id, 'courier', 0, n, 0, []))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(manager._cache) <= 3
+
+
+# ============================================================================
+# SQL STATEMENT TESTS
+# ============================================================================
+
+class TestCareerSql:
+    """Unit tests for the per-dialect SQL statements"""
+
+    def test_dialects_define_same_statements(self):
+        """Test that SQLite and PostgreSQL have the same statement set"""
+        assert set(_SQLITE_SQL) == set(_POSTGRES_SQL)
+
+    @pytest.mark.parametrize('name', sorted(_SQLITE_SQL))
+    def test_dialects_differ_only_in_placeholders(self, name):
+        """Test that each PostgreSQL statement matches its SQLite twin"""
+        sqlite_sql, postgres_sql = _SQLITE_SQL[name], _POSTGRES_SQL[name]
+        assert '%' not in sqlite_sql
+        assert '?' not in postgres_sql
+        assert sqlite_sql.count('?') == postgres_sql.count('%s')
+        assert sqlite_sql.split('?') == postgres_sql.split('%s')